@@ -0,0 +1,36 @@
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework import permissions, viewsets
+
+from employees.models import Employee
+from employees.serializers import EmployeeSerializer
+from ez_request.api import ConditionalGetMixin, NewestFirstCursorPagination
+
+
+class IsAdminEmployee(permissions.BasePermission):
+    message = "Access denied. Admins only."
+
+    def has_permission(self, request, view):
+        return hasattr(request.user, 'employee') and request.user.employee.role == 'ADMIN'
+
+
+class EmployeePagination(NewestFirstCursorPagination):
+    ordering = ('id',)
+
+
+class EmployeeViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Employee directory (admins only, same as the HTML employee list).
+    """
+    serializer_class = EmployeeSerializer
+    permission_classes = [permissions.IsAuthenticated, IsAdminEmployee]
+    pagination_class = EmployeePagination
+
+    def get_queryset(self):
+        # The ETag's fingerprint and the page are separate reads; routed to two
+        # replicas lagging differently, a stale page could get a current ETag
+        # and be revalidated with 304s until the next change
+        queryset = Employee.objects.using(DEFAULT_DB_ALIAS).select_related('user')
+        role = self.request.query_params.get('role')
+        if role:
+            queryset = queryset.filter(role=role)
+        return queryset
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+
+from employees.models import Employee
+
+CACHE_KEY = 'approver_directory:{role}'
+ROLE_LABELS = dict(Employee.ROLE_CHOICES)
+
+
+def format_label(username, role, position):
+    # Same text as Employee.__str__, without touching employee.user per row
+    return f"{username} ({ROLE_LABELS.get(role, role)}) - {position}"
+
+
+def get_approver_choices(role):
+    """
+    [(employee_id, label), ...] for every employee with `role`, loaded with a
+    single joined query and cached until an Employee or User changes.
+    """
+    key = CACHE_KEY.format(role=role)
+    choices = cache.get(key)
+    if choices is None:
+        # Cached for an hour and shared by every form, so never from a lagging replica
+        rows = Employee.objects.using(DEFAULT_DB_ALIAS).filter(role=role).order_by('user__username').values_list(
+            'id', 'user__username', 'role', 'position'
+        )
+        choices = [(pk, format_label(username, role_, position)) for pk, username, role_, position in rows]
+        cache.set(key, choices, getattr(settings, 'APPROVER_DIRECTORY_TIMEOUT', 3600))
+    return choices
+
+
+def invalidate_approver_choices():
+    # After commit: dropping the lists earlier lets a concurrent form cache
+    # the old rows again for the whole timeout
+    keys = [CACHE_KEY.format(role=role) for role, _ in Employee.ROLE_CHOICES]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def search_approvers(role, term, limit=20):
+    """
+    Prefix search used by the autocomplete endpoint.
+    """
+    qs = Employee.objects.filter(role=role).order_by('user__username')
+    if term:
+        qs = qs.filter(
+            Q(user__username__istartswith=term) | Q(user__first_name__istartswith=term) | Q(user__last_name__istartswith=term)
+        )
+    rows = qs.values_list('id', 'user__username', 'role', 'position')[:limit]
+    return [{'id': pk, 'text': format_label(username, role_, position)} for pk, username, role_, position in rows]
@@ -63,3 +63,9 @@ class EmployeeForm(forms.ModelForm):
             'phone': forms.TextInput(attrs={'class': 'form-control'}),
             'date_hired': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
         }
+
+class EmployeeImportForm(forms.Form):
+    file = forms.FileField(
+        help_text="CSV with columns: username, password, email, first_name, last_name, role, position, department, phone, date_hired",
+        widget=forms.FileInput(attrs={'class': 'form-control', 'accept': '.csv,text/csv'}),
+    )
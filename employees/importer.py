@@ -0,0 +1,250 @@
+import csv
+import io
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+from django import forms
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import IntegrityError, connections, transaction
+
+from employees.directory import invalidate_approver_choices
+from employees.models import Employee
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+COLUMNS = ['username', 'password', 'email', 'first_name', 'last_name', 'role', 'position', 'department', 'phone', 'date_hired']
+REQUIRED = ['username', 'password', 'position', 'department', 'date_hired']
+
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+LOOKUP_CHUNK = 500
+
+JOB_KEY = 'employee_import:{job_id}'
+JOB_TIMEOUT = 24 * 60 * 60
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class EmployeeRowForm(forms.Form):
+    """
+    Field-level validation for one CSV row (same fields as EmployeeUserCreationForm).
+    """
+    username = forms.CharField(max_length=150)
+    password = forms.CharField()
+    email = forms.EmailField(required=False)
+    first_name = forms.CharField(max_length=150, required=False)
+    last_name = forms.CharField(max_length=150, required=False)
+    role = forms.ChoiceField(choices=Employee.ROLE_CHOICES, required=False)
+    position = forms.CharField(max_length=100)
+    department = forms.CharField(max_length=100)
+    phone = forms.CharField(max_length=20, required=False)
+    date_hired = forms.DateField()
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    errors: list = field(default_factory=list)  # [(line_number, message)]
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+
+def _setup_django():
+    # Pool workers started with "spawn" (macOS/Windows) need their own setup
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ez_request.settings')
+    django.setup()
+
+
+def hash_workers():
+    return getattr(settings, 'EMPLOYEE_IMPORT_HASH_WORKERS', 0) or os.cpu_count() or 1
+
+
+def hash_passwords(passwords, workers=1):
+    """
+    PBKDF2 is deliberately slow (~0.3 s per password), so big imports spread
+    the hashing across a process pool. workers=1 hashes inline.
+    """
+    if workers <= 1 or len(passwords) < 2:
+        return [make_password(p) for p in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_setup_django) as pool:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def read_rows(file_obj):
+    """
+    Yield (line_number, row_dict) from a CSV file object (text or bytes).
+    """
+    if isinstance(file_obj.read(0), bytes):
+        # Django UploadedFile keeps the real stream on .file
+        file_obj = io.TextIOWrapper(getattr(file_obj, 'file', file_obj), encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(file_obj)
+    missing = [c for c in REQUIRED if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+    for row in reader:
+        yield reader.line_num, {k: (v or '').strip() for k, v in row.items() if k in COLUMNS}
+
+
+def validate_rows(rows, result):
+    """
+    Validate every row; usernames are checked against the database with a
+    few chunked IN queries instead of one exists() per row.
+    """
+    valid = []
+    seen = {}
+    for line, row in rows:
+        form = EmployeeRowForm(row)
+        if not form.is_valid():
+            errors = '; '.join(f"{name}: {' '.join(msgs)}" for name, msgs in form.errors.items())
+            result.add_error(line, errors)
+            continue
+        data = form.cleaned_data
+        data['role'] = data['role'] or 'KARYAWAN'
+        if data['username'] in seen:
+            result.add_error(line, f"Duplicate username in file (first seen on line {seen[data['username']]}).")
+            continue
+        seen[data['username']] = line
+        valid.append((line, data))
+
+    usernames = [data['username'] for _, data in valid]
+    existing = set()
+    for i in range(0, len(usernames), LOOKUP_CHUNK):
+        existing.update(User.objects.filter(username__in=usernames[i:i + LOOKUP_CHUNK]).values_list('username', flat=True))
+
+    accepted = []
+    for line, data in valid:
+        if data['username'] in existing:
+            result.add_error(line, "A user with this username already exists.")
+        else:
+            accepted.append((line, data))
+    return accepted
+
+
+def _insert_batch(batch):
+    with transaction.atomic():
+        User.objects.bulk_create([
+            User(
+                username=data['username'], password=data['password_hash'], email=data['email'],
+                first_name=data['first_name'], last_name=data['last_name'],
+            )
+            for _, data in batch
+        ])
+        # Re-read ids (MySQL does not return them from bulk_create)
+        user_ids = dict(User.objects.filter(username__in=[d['username'] for _, d in batch]).values_list('username', 'id'))
+        Employee.objects.bulk_create([
+            Employee(
+                user_id=user_ids[data['username']], role=data['role'], position=data['position'],
+                department=data['department'], phone=data['phone'], date_hired=data['date_hired'],
+            )
+            for _, data in batch
+        ])
+
+
+def import_employees(file_obj, batch_size=500, workers=1):
+    """
+    Validate a whole CSV, hash passwords in parallel and insert with
+    bulk_create in batches. Bad rows are reported, not fatal.
+    """
+    result = ImportResult()
+    try:
+        accepted = validate_rows(read_rows(file_obj), result)
+    except (ValueError, csv.Error, UnicodeDecodeError) as exc:
+        result.add_error(0, str(exc))
+        return result
+
+    hashes = hash_passwords([data['password'] for _, data in accepted], workers)
+    for (_, data), password_hash in zip(accepted, hashes):
+        data['password_hash'] = password_hash
+
+    for i in range(0, len(accepted), batch_size):
+        batch = accepted[i:i + batch_size]
+        try:
+            _insert_batch(batch)
+            result.created += len(batch)
+        except IntegrityError:
+            # Someone created a clashing user meanwhile: retry row by row to pinpoint it
+            for row in batch:
+                try:
+                    _insert_batch([row])
+                    result.created += 1
+                except IntegrityError:
+                    result.add_error(row[0], "A user with this username already exists.")
+
+    # bulk_create skips post_save, so refresh the cached approver dropdowns by hand
+    if result.created:
+        invalidate_approver_choices()
+    result.errors.sort()
+    return result
+
+
+# --- Background imports from the web page --------------------------------
+
+def executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'EMPLOYEE_IMPORT_WORKERS', 1),
+                thread_name_prefix='employee-import',
+            )
+    return _executor
+
+
+def start_import(uploaded_file):
+    """
+    Queue an uploaded CSV for import and return the job id to poll with
+    get_import_job(). Hashing a large file takes minutes, far longer than a
+    web request may run. EMPLOYEE_IMPORT_WORKERS = 0 imports inline instead.
+    """
+    fd, path = tempfile.mkstemp(prefix='employee-import-', suffix='.csv')
+    with os.fdopen(fd, 'wb') as fh:
+        for chunk in uploaded_file.chunks():
+            fh.write(chunk)
+    job_id = uuid.uuid4().hex
+    cache.set(JOB_KEY.format(job_id=job_id), {'done': False}, JOB_TIMEOUT)
+    if getattr(settings, 'EMPLOYEE_IMPORT_WORKERS', 1) <= 0:
+        run_import_job(job_id, path)
+    else:
+        executor().submit(_run_in_background, job_id, path)
+    return job_id
+
+
+def run_import_job(job_id, path):
+    try:
+        with open(path, newline='', encoding='utf-8-sig') as fh:
+            result = import_employees(fh, workers=hash_workers())
+    except Exception:
+        logger.exception('Employee import %s failed', job_id)
+        result = ImportResult(errors=[(0, 'The import failed unexpectedly; no further rows were imported.')])
+    finally:
+        os.remove(path)
+    cache.set(JOB_KEY.format(job_id=job_id), {'done': True, **asdict(result)}, JOB_TIMEOUT)
+
+
+def _run_in_background(job_id, path):
+    try:
+        run_import_job(job_id, path)
+    finally:
+        # No request cycle closes this thread's connections
+        connections.close_all()
+
+
+def get_import_job(job_id):
+    """
+    None for an unknown or expired job, else {'done': bool} plus the
+    ImportResult fields once it finished.
+    """
+    return cache.get(JOB_KEY.format(job_id=job_id))
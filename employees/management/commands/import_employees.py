@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.importer import hash_workers, import_employees
+
+
+class Command(BaseCommand):
+    help = "Bulk-create users and employees from a CSV file, reporting per-row errors."
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=None, help='Password hashing processes (default: EMPLOYEE_IMPORT_HASH_WORKERS)')
+
+    def handle(self, *args, **options):
+        try:
+            fh = open(options['csv_file'], newline='', encoding='utf-8-sig')
+        except OSError as exc:
+            raise CommandError(exc)
+
+        with fh:
+            result = import_employees(fh, batch_size=options['batch_size'], workers=options['workers'] or hash_workers())
+
+        for line, message in result.errors:
+            self.stderr.write(f"line {line}: {message}")
+        self.stdout.write(self.style.SUCCESS(f"{result.created} employee(s) created, {len(result.errors)} row(s) skipped."))
@@ -0,0 +1,15 @@
+from rest_framework import serializers
+
+from employees.models import Employee
+from ez_request.api import SparseFieldsetsMixin
+
+
+class EmployeeSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    username = serializers.CharField(source='user.username', read_only=True)
+    full_name = serializers.CharField(source='user.get_full_name', read_only=True)
+    email = serializers.EmailField(source='user.email', read_only=True)
+
+    class Meta:
+        model = Employee
+        fields = ['id', 'username', 'full_name', 'email', 'role', 'position', 'department', 'phone', 'date_hired']
+        read_only_fields = fields
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from employees.directory import invalidate_approver_choices
+from employees.models import Employee
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_directory(sender, **kwargs):
+    invalidate_approver_choices()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_directory_on_user_change(sender, update_fields=None, **kwargs):
+    # Labels include the username; skip saves that cannot change it (e.g. last_login on every login)
+    if update_fields is None or 'username' in update_fields:
+        invalidate_approver_choices()
@@ -1,3 +1,114 @@
-from django.test import TestCase
+import datetime
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from employees.models import Employee
+from users.models import User
+
+
+class EmployeeListQueryBudgetTests(TestCase):
+    def setUp(self):
+        self.admin = self.make_employee('admin', 'ADMIN')
+
+    def make_employee(self, username, role='KARYAWAN'):
+        user = User.objects.create(username=username)
+        return Employee.objects.create(
+            user=user, role=role, position='Staff', department='Ops', phone='0', date_hired=datetime.date.today()
+        )
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        self.client.force_login(self.admin.user)
+        url = reverse('employees:list')
+        with self.assertNumQueries(5):
+            self.client.get(url)
+        for i in range(15):
+            self.make_employee(f'staff{i}')
+        with self.assertNumQueries(5):
+            self.client.get(url)
+
+
+@override_settings(EMPLOYEE_IMPORT_WORKERS=0, EMPLOYEE_IMPORT_HASH_WORKERS=1)
+class EmployeeImportTests(TestCase):
+    HEADER = 'username,password,email,first_name,role,position,department,date_hired'
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create(username='admin')
+        self.admin = Employee.objects.create(
+            user=user, role='ADMIN', position='Admin', department='IT', phone='0', date_hired=datetime.date.today()
+        )
+
+    def upload(self, *rows, follow=True):
+        # What Excel saves: a BOM and CRLF line endings
+        content = '\ufeff' + '\r\n'.join([self.HEADER, *rows]) + '\r\n'
+        self.client.force_login(self.admin.user)
+        return self.client.post(reverse('employees:import'), {
+            'file': SimpleUploadedFile('staff.csv', content.encode('utf-8'), content_type='text/csv'),
+        }, follow=follow)
+
+    def test_import_page_creates_employees(self):
+        response = self.upload(
+            'budi,s3cret-pass,budi@example.com,Budi,MANAGER,Lead,"Ops, East",2024-01-15',
+            'sari,s3cret-pass,,Sari,,Staff,Ops,2024-02-01',
+        )
+        self.assertEqual(response.context['job']['created'], 2)
+        self.assertEqual(response.context['job']['errors'], [])
+        self.assertContains(response, '2 employee(s) imported, 0 row(s) skipped.')
+
+        budi = Employee.objects.select_related('user').get(user__username='budi')
+        self.assertEqual((budi.role, budi.department, budi.date_hired), ('MANAGER', 'Ops, East', datetime.date(2024, 1, 15)))
+        self.assertTrue(budi.user.check_password('s3cret-pass'))
+        self.assertEqual(Employee.objects.get(user__username='sari').role, 'KARYAWAN')
+
+    def test_bad_rows_are_reported_and_skipped(self):
+        response = self.upload(
+            'budi,s3cret-pass,,Budi,,Staff,Ops,2024-01-15',
+            'budi,other-pass,,Budi,,Staff,Ops,2024-01-15',
+            'admin,s3cret-pass,,Admin,,Staff,Ops,2024-01-15',
+            'eko,s3cret-pass,not-an-email,Eko,,Staff,Ops,someday',
+        )
+        job = response.context['job']
+        self.assertEqual(job['created'], 1)
+        self.assertEqual([line for line, _ in job['errors']], [3, 4, 5])
+        self.assertIn('Duplicate username in file (first seen on line 2)', job['errors'][0][1])
+        self.assertIn('already exists', job['errors'][1][1])
+        self.assertIn('date_hired', job['errors'][2][1])
+        self.assertCountEqual(User.objects.values_list('username', flat=True), ['admin', 'budi'])
+
+    @override_settings(EMPLOYEE_IMPORT_WORKERS=1)
+    def test_web_import_runs_in_background(self):
+        queued = []
+        with mock.patch('employees.importer.executor') as executor:
+            executor.return_value.submit.side_effect = lambda fn, *args: queued.append((fn, args))
+            response = self.upload('budi,s3cret-pass,,Budi,,Staff,Ops,2024-01-15', follow=False)
+        # The request returns before any password is hashed
+        self.assertEqual(len(queued), 1)
+        self.assertFalse(User.objects.filter(username='budi').exists())
+        self.assertContains(self.client.get(response.url), 'Import in progress')
+
+        fn, args = queued[0]
+        with mock.patch('employees.importer.connections.close_all'):
+            fn(*args)
+        response = self.client.get(response.url)
+        self.assertContains(response, '1 employee(s) imported, 0 row(s) skipped.')
+        self.assertTrue(User.objects.filter(username='budi').exists())
+
+        response = self.client.get(reverse('employees:import'), {'job': 'unknown'})
+        self.assertIsNone(response.context['job'])
+
+    def test_command_reports_per_row_errors(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, newline='') as fh:
+            fh.write(self.HEADER + '\nbudi,s3cret-pass,,Budi,,Staff,Ops,2024-01-15\nsari,,,Sari,,Staff,Ops,2024-01-15\n')
+        self.addCleanup(os.remove, fh.name)
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_employees', fh.name, workers=1, stdout=stdout, stderr=stderr)
+        self.assertIn('1 employee(s) created, 1 row(s) skipped', stdout.getvalue())
+        self.assertIn('line 3: password', stderr.getvalue())
@@ -3,7 +3,9 @@ from employees.views import (
     employee_list_view,
     employee_create_view,
     employee_update_view,
-    employee_delete_view
+    employee_delete_view,
+    employee_import_view,
+    approver_search_view
 )
 
 app_name = 'employees'
@@ -13,4 +15,6 @@ urlpatterns = [
     path('create/', employee_create_view, name='create'),
     path('update/<int:pk>/', employee_update_view, name='update'),
     path('delete/<int:pk>/', employee_delete_view, name='delete'),
+    path('import/', employee_import_view, name='import'),
+    path('approvers/', approver_search_view, name='approvers'),
 ]
@@ -1,9 +1,13 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db import IntegrityError
+from django.http import JsonResponse
 from employees.models import Employee
-from employees.forms import EmployeeForm, EmployeeUserCreationForm
+from employees.forms import EmployeeForm, EmployeeUserCreationForm, EmployeeImportForm
+from employees.importer import get_import_job, start_import
+from employees.directory import search_approvers
 
 @login_required
 def employee_list_view(request):
@@ -11,7 +15,7 @@ def employee_list_view(request):
         messages.error(request, "Access denied. Admins only.")
         return redirect('users:dashboard')
         
-    employees_qs = Employee.objects.all().order_by('user__username')
+    employees_qs = Employee.objects.select_related('user').order_by('user__username')
     
     # Pagination
     from django.core.paginator import Paginator
@@ -76,3 +80,41 @@ def employee_delete_view(request, pk):
         messages.success(request, "Employee profile deleted successfully")
         return redirect('employees:list')
     return render(request, 'employees/delete.html', {'employee': employee})
+
+@login_required
+def employee_import_view(request):
+    if not hasattr(request.user, 'employee') or request.user.employee.role != 'ADMIN':
+        messages.error(request, "Access denied. Admins only.")
+        return redirect('users:dashboard')
+
+    job = None
+    if request.method == 'POST':
+        form = EmployeeImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            # Runs in the background: hashing a big file takes minutes
+            job_id = start_import(form.cleaned_data['file'])
+            return redirect(f"{reverse('employees:import')}?job={job_id}")
+    else:
+        form = EmployeeImportForm()
+        job_id = request.GET.get('job')
+        if job_id:
+            job = get_import_job(job_id)
+            if job is None:
+                messages.error(request, "This import is unknown or its result has expired.")
+    return render(request, 'employees/import.html', {'form': form, 'job': job, 'title': 'Import Employees'})
+
+@login_required
+def approver_search_view(request):
+    """
+    JSON autocomplete for the approver dropdowns: ?role=MANAGER|DIREKTUR&q=<prefix>
+    """
+    role = request.GET.get('role')
+    if not hasattr(request.user, 'employee') or role not in ('MANAGER', 'DIREKTUR'):
+        return JsonResponse({'results': []}, status=400)
+
+    try:
+        limit = min(int(request.GET.get('limit', 20)), 50)
+    except ValueError:
+        limit = 20
+
+    return JsonResponse({'results': search_approvers(role, request.GET.get('q', '').strip(), limit)})
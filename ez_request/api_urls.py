@@ -0,0 +1,13 @@
+from rest_framework.routers import DefaultRouter
+
+from employees.api import EmployeeViewSet
+from service_requests.api import ApprovalViewSet, ServiceRequestViewSet
+
+app_name = 'api-v1'
+
+router = DefaultRouter()
+router.register('requests', ServiceRequestViewSet, basename='request')
+router.register('approvals', ApprovalViewSet, basename='approval')
+router.register('employees', EmployeeViewSet, basename='employee')
+
+urlpatterns = router.urls
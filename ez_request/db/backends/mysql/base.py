@@ -0,0 +1,13 @@
+from django.db.backends.mysql.base import Database
+from django.db.backends.mysql.base import DatabaseWrapper as MySQLDatabaseWrapper
+
+from ez_request.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, MySQLDatabaseWrapper):
+    def raw_connection_usable(self, raw):
+        try:
+            raw.ping()
+        except Database.Error:
+            return False
+        return True
@@ -0,0 +1,163 @@
+"""
+Process-local connection pool for database backends without native pooling.
+
+Django's MySQL backend opens a new connection (TCP + auth handshake) for
+every connect(). With CONN_MAX_AGE a connection survives between requests,
+but only for the thread that opened it. The pool is shared by all threads
+of one worker process instead: close() hands the raw connection back,
+and the next connect() on any thread reuses it after a cheap liveness check.
+
+Enable it by pointing ENGINE at `ez_request.db.backends.mysql` (or
+`.sqlite3` for local benchmarking) and setting OPTIONS['pool']:
+
+    'OPTIONS': {'pool': {'max_size': 4, 'max_lifetime': 1800}}
+
+max_size is the number of idle connections kept per worker process, so it
+should match the worker's thread count. Extra connections opened during a
+burst are closed when released instead of pooled. Connections older than
+max_lifetime seconds are retired rather than reused, which keeps them below
+the server's wait_timeout.
+"""
+import os
+import queue
+import threading
+import time
+
+DEFAULT_MAX_SIZE = 4
+DEFAULT_MAX_LIFETIME = 30 * 60
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, max_lifetime=DEFAULT_MAX_LIFETIME):
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        # LIFO so the warmest connections are reused and the rest can age out
+        self.idle = queue.LifoQueue(maxsize=max_size)
+        self.created = {}
+        self.hits = self.misses = 0
+
+    def get(self, is_usable):
+        """
+        Pop an idle connection that is young enough and passes `is_usable`,
+        or return None.
+        """
+        while True:
+            try:
+                raw = self.idle.get_nowait()
+            except queue.Empty:
+                self.misses += 1
+                return None
+            if self.expired(raw) or not is_usable(raw):
+                self.discard(raw)
+                continue
+            self.hits += 1
+            return raw
+
+    def track(self, raw):
+        self.created[id(raw)] = time.monotonic()
+        return raw
+
+    def put(self, raw):
+        """
+        Return a connection to the pool; close it when the pool is full.
+        """
+        if self.expired(raw):
+            self.discard(raw)
+            return
+        try:
+            self.idle.put_nowait(raw)
+        except queue.Full:
+            self.discard(raw)
+
+    def expired(self, raw):
+        created = self.created.get(id(raw))
+        return created is None or time.monotonic() - created > self.max_lifetime
+
+    def discard(self, raw):
+        self.created.pop(id(raw), None)
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def clear(self):
+        while True:
+            try:
+                self.discard(self.idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def stats(self):
+        return {'idle': self.idle.qsize(), 'max_size': self.max_size, 'hits': self.hits, 'misses': self.misses}
+
+
+def get_pool(alias, options):
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = ConnectionPool(
+                max_size=options.get('max_size', DEFAULT_MAX_SIZE),
+                max_lifetime=options.get('max_lifetime', DEFAULT_MAX_LIFETIME),
+            )
+        return _pools[alias]
+
+
+def close_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.clear()
+        _pools.clear()
+
+
+def _forget_inherited_pools():
+    # A forked worker must not share sockets with its parent (gunicorn --preload)
+    _pools.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_inherited_pools)
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Mix into a backend's DatabaseWrapper to take connections from and return
+    them to the process pool. `raw_connection_usable(raw)` is the backend's
+    liveness check for a connection that is not attached to a wrapper yet.
+    """
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict['OPTIONS'].get('pool') or {})
+
+    def raw_connection_usable(self, raw):
+        return True
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Ours, not the driver's
+        params.pop('pool', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        raw = self.pool.get(self.raw_connection_usable)
+        if raw is None:
+            raw = self.pool.track(super().get_new_connection(conn_params))
+        return raw
+
+    def _close(self):
+        raw = self.connection
+        if raw is None:
+            return
+        # A connection dropped mid-transaction or after an error is not reused
+        if self.in_atomic_block or self.errors_occurred:
+            self.pool.discard(raw)
+            return
+        try:
+            if not self.autocommit:
+                raw.rollback()
+        except Exception:
+            self.pool.discard(raw)
+            return
+        self.pool.put(raw)
@@ -0,0 +1,66 @@
+"""
+Read replicas with read-your-writes stickiness.
+
+ReplicaRouter sends reads to one of DATABASE_REPLICAS and everything else
+(writes, migrations, select_for_update, reads inside a transaction) to the
+primary. Reads stay on the primary while `use_primary()` is active, which
+ReplicaStickinessMiddleware arranges for
+- the rest of any POST/PUT/PATCH/DELETE request, and
+- every request for REPLICA_STICKY_SECONDS afterwards, via a short-lived
+  cookie, so a redirect after approving or creating a request already sees
+  the change even if the replica lags behind.
+
+Sessions are always read from the primary: a stale session would log the
+user out right after login.
+"""
+import contextlib
+import contextvars
+import random
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRIMARY_ONLY_APPS = {'sessions'}
+
+_pinned = contextvars.ContextVar('replica_router_pinned', default=False)
+
+
+def replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def primary_pinned():
+    return _pinned.get()
+
+
+@contextlib.contextmanager
+def use_primary():
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        if not aliases or _pinned.get() or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        # Reads inside a transaction must see its own uncommitted writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data, so objects from any of them may be related
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,171 @@
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from ez_request import page_cache
+from ez_request.db import routers
+
+logger = logging.getLogger('ez_request.sql')
+
+
+class QueryStats:
+    """
+    execute_wrapper that records every query run while it is installed.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.similar = Counter()    # same SQL, any params (N+1 candidates)
+        self.duplicates = Counter() # same SQL and same params
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.similar[sql] += 1
+            try:
+                self.duplicates[(sql, repr(params))] += 1
+            except Exception:
+                pass
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+    def repeated(self, counter):
+        return sum(n - 1 for n in counter.values() if n > 1)
+
+    def worst(self, counter, limit=3):
+        return [(key if isinstance(key, str) else key[0], n) for key, n in counter.most_common(limit) if n > 1]
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Opt-in (SQL_INSTRUMENTATION=True) per-request query counter. Adds a
+    Server-Timing header and logs one JSON line when a request goes over
+    SQL_QUERY_BUDGET queries or SQL_TIME_BUDGET_MS of database time.
+    Works with DEBUG off, unlike connection.queries.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SQL_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.query_budget = getattr(settings, 'SQL_QUERY_BUDGET', 20)
+        self.time_budget_ms = getattr(settings, 'SQL_TIME_BUDGET_MS', 200)
+
+    def __call__(self, request):
+        stats = QueryStats()
+        with self.instrument(stats):
+            response = self.get_response(request)
+
+        if response.streaming:
+            # Headers are sent before the body is generated, so there is no
+            # Server-Timing; the budget is checked once the body's queries ran.
+            # Async bodies run their queries on other threads and are not counted.
+            if not response.is_async:
+                response.streaming_content = self.stream(response.streaming_content, request, response, stats)
+            return response
+
+        timing = (
+            f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries", '
+            f'db-dup;desc="{stats.repeated(stats.duplicates)} duplicate, {stats.repeated(stats.similar)} similar"'
+        )
+        existing = response.get('Server-Timing')
+        response['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+        self.check_budget(request, response, stats)
+        return response
+
+    def instrument(self, stats):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+        return stack
+
+    def stream(self, content, request, response, stats):
+        try:
+            with self.instrument(stats):
+                yield from content
+        finally:
+            self.check_budget(request, response, stats)
+
+    def check_budget(self, request, response, stats):
+        if stats.count > self.query_budget or stats.duration_ms > self.time_budget_ms:
+            match = getattr(request, 'resolver_match', None)
+            logger.warning(json.dumps({
+                'event': 'sql_budget_exceeded',
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                'queries': stats.count,
+                'db_ms': round(stats.duration_ms, 2),
+                'duplicate_queries': stats.repeated(stats.duplicates),
+                'similar_queries': stats.repeated(stats.similar),
+                'top_similar': stats.worst(stats.similar),
+                'query_budget': self.query_budget,
+                'time_budget_ms': self.time_budget_ms,
+            }))
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Answer cookie-less GET/HEAD requests for pages stored by
+    @cache_anonymous_page before the session, auth and messages middleware
+    run. Misses fall through to the view, which fills the cache.
+    """
+
+    def __init__(self, get_response):
+        if page_cache.page_cache_timeout() <= 0:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if page_cache.is_candidate(request) and not page_cache.has_state_cookies(request):
+            entry = page_cache.fetch(request)
+            if entry is not None:
+                return page_cache.build_response(request, entry)
+        return self.get_response(request)
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Read-your-writes for ez_request.db.routers.ReplicaRouter: pin reads to
+    the primary for the rest of a write request and, through a short-lived
+    cookie, for REPLICA_STICKY_SECONDS after it. Not installed without
+    DATABASE_REPLICAS.
+    """
+
+    UNSAFE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+    def __init__(self, get_response):
+        if not routers.replicas():
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.cookie_name = getattr(settings, 'REPLICA_STICKY_COOKIE_NAME', 'ez_primary')
+        self.sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+
+    def __call__(self, request):
+        wrote = request.method in self.UNSAFE_METHODS
+        if not wrote and self.cookie_name not in request.COOKIES:
+            return self.get_response(request)
+
+        with routers.use_primary():
+            response = self.get_response(request)
+        if wrote:
+            # Only ever forces primary reads, so there is nothing to gain by forging it
+            response.set_cookie(
+                self.cookie_name, '1', max_age=self.sticky_seconds,
+                secure=settings.SESSION_COOKIE_SECURE, httponly=True, samesite='Lax',
+            )
+        return response
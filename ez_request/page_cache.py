@@ -0,0 +1,109 @@
+"""
+Full-response cache for the public marketing pages (welcome/about/gallery/team).
+
+Views decorated with @cache_anonymous_page store their rendered HTML for
+anonymous visitors. AnonymousPageCacheMiddleware, which sits before the
+session/auth/messages middleware, answers later cookie-less requests straight
+from that cache, and both paths turn If-None-Match / If-Modified-Since into 304s.
+Logged-in users always get a freshly rendered page.
+
+Keys are `page:<PAGE_CACHE_VERSION>:<path>`; bump PAGE_CACHE_VERSION (or clear
+the `pages` cache) after deploying template changes.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+CACHEABLE_METHODS = ('GET', 'HEAD')
+
+
+def page_cache():
+    return caches[getattr(settings, 'PAGE_CACHE_ALIAS', 'default')]
+
+
+def page_cache_timeout():
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 600)
+
+
+def page_key(path):
+    return f"page:{getattr(settings, 'PAGE_CACHE_VERSION', '1')}:{path}"
+
+
+def has_state_cookies(request):
+    """
+    Session or flash-message cookies mean the page may be personalised.
+    """
+    return settings.SESSION_COOKIE_NAME in request.COOKIES or 'messages' in request.COOKIES
+
+
+def is_candidate(request):
+    # Query strings are never cached so ?x=<random> can't flood the cache
+    return (
+        page_cache_timeout() > 0
+        and request.method in CACHEABLE_METHODS
+        and not request.META.get('QUERY_STRING')
+        and 'HTTP_AUTHORIZATION' not in request.META
+    )
+
+
+def build_response(request, entry, hit=True):
+    """
+    Turn a cached entry into a 200 (or a 304 if the client's copy is current).
+    """
+    response = get_conditional_response(request, etag=entry['etag'], last_modified=entry['last_modified'])
+    if response is None:
+        response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    # Browsers must revalidate so a visitor who logs in never sees the anonymous navbar
+    response['Cache-Control'] = 'no-cache'
+    response['X-Page-Cache'] = 'hit' if hit else 'miss'
+    response.setdefault('X-Frame-Options', getattr(settings, 'X_FRAME_OPTIONS', 'DENY'))
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def fetch(request):
+    return page_cache().get(page_key(request.path))
+
+
+def store(request, response):
+    content = response.content
+    entry = {
+        'content': content,
+        'content_type': response['Content-Type'],
+        'etag': quote_etag(hashlib.sha1(content).hexdigest()),
+        'last_modified': int(time.time()),
+    }
+    page_cache().set(page_key(request.path), entry, page_cache_timeout())
+    return entry
+
+
+def cache_anonymous_page(view_func):
+    """
+    Serve/store the view's response for anonymous visitors without pending
+    messages. Anything else (logged-in users, errors, redirects) passes through.
+    """
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not is_candidate(request) or request.user.is_authenticated or '_messages' in request.session:
+            return view_func(request, *args, **kwargs)
+
+        entry = fetch(request)
+        if entry is None:
+            response = view_func(request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming or response.cookies:
+                return response
+            if hasattr(response, 'render'):
+                response.render()
+            return build_response(request, store(request, response), hit=False)
+        return build_response(request, entry)
+
+    return wrapper
@@ -14,6 +14,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 from dotenv import load_dotenv
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -50,7 +51,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'ez_request.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'ez_request.middleware.AnonymousPageCacheMiddleware',
+    'ez_request.middleware.ReplicaStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -59,6 +63,12 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request SQL instrumentation (Server-Timing header + log line over budget).
+# Disabled unless SQL_INSTRUMENTATION=True; safe to enable with DEBUG off.
+SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION') == 'True'
+SQL_QUERY_BUDGET = int(os.getenv('SQL_QUERY_BUDGET', 20))
+SQL_TIME_BUDGET_MS = float(os.getenv('SQL_TIME_BUDGET_MS', 200))
+
 ROOT_URLCONF = 'ez_request.urls'
 
 TEMPLATES = [
@@ -81,31 +91,22 @@ WSGI_APPLICATION = 'ez_request.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
-
-# Database
-# https://docs.djangoproject.com/en/5.2/ref/settings/#databases
-
-import socket
+# DB_ENGINE picks the profile explicitly: 'mysql' or 'sqlite'. Left unset it
+# is 'mysql' when the DB_* credentials are filled in and 'sqlite' otherwise.
+# Nothing is probed at import time; a MySQL server that is down surfaces as a
+# connection error on first query, and `python manage.py check_database`
+# reports reachability and latency (e.g. as a readiness probe).
 
 DB_NAME = os.getenv('DB_NAME')
 DB_USER = os.getenv('DB_USER')
 DB_PASSWORD = os.getenv('DB_PASSWORD')
 DB_HOST = os.getenv('DB_HOST')
 DB_PORT = os.getenv('DB_PORT', '3306')
+DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', '5'))
 
-USE_MYSQL = False
+DB_ENGINE = os.getenv('DB_ENGINE') or ('mysql' if all([DB_NAME, DB_USER, DB_PASSWORD, DB_HOST]) else 'sqlite')
 
-if all([DB_NAME, DB_USER, DB_PASSWORD, DB_HOST]):
-    try:
-        # Check if MySQL port is open
-        sock = socket.create_connection((DB_HOST, int(DB_PORT)), timeout=1)
-        sock.close()
-        USE_MYSQL = True
-    except (socket.timeout, socket.error):
-        print("⚠️ MySQL is not reachable. Falling back to SQLite.")
-        pass
-
-if USE_MYSQL:
+if DB_ENGINE == 'mysql':
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.mysql',
@@ -114,15 +115,120 @@ if USE_MYSQL:
             'PASSWORD': DB_PASSWORD,
             'HOST': DB_HOST,
             'PORT': DB_PORT,
+            'OPTIONS': {
+                'connect_timeout': DB_CONNECT_TIMEOUT,
+            },
         }
     }
-else:
+elif DB_ENGINE == 'sqlite':
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
+            'NAME': os.getenv('DB_SQLITE_PATH') or BASE_DIR / 'db.sqlite3',
         }
     }
+else:
+    raise ImproperlyConfigured(f"DB_ENGINE must be 'mysql' or 'sqlite', not {DB_ENGINE!r}")
+
+# Keep each thread's connection open for DB_CONN_MAX_AGE seconds (0 closes it
+# after every request, None never does) and ping it before reuse at the start
+# of each request. DB_POOL_SIZE > 0 switches to ez_request.db.pool instead:
+# connections go back to a per-process pool after every request, shared by
+# all threads of the worker; size it to the worker's thread count.
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '60'))
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '0'))
+DB_POOL_MAX_LIFETIME = int(os.getenv('DB_POOL_MAX_LIFETIME', '1800'))
+
+DATABASES['default']['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+if DB_POOL_SIZE > 0:
+    DATABASES['default']['ENGINE'] = f"ez_request.db.backends.{'mysql' if DB_ENGINE == 'mysql' else 'sqlite3'}"
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'max_size': DB_POOL_SIZE,
+        'max_lifetime': DB_POOL_MAX_LIFETIME,
+    }
+
+# Read replicas (ez_request.db.routers.ReplicaRouter). DB_REPLICAS is a
+# comma-separated list: host[:port] for MySQL (same name and credentials as
+# the primary) or file paths for SQLite, e.g. a copy of db.sqlite3 to try the
+# routing locally. After a write, reads stay on the primary for
+# DB_REPLICA_STICKY_SECONDS so users always see their own changes.
+DB_REPLICAS = [replica.strip() for replica in os.getenv('DB_REPLICAS', '').split(',') if replica.strip()]
+
+DATABASE_REPLICAS = []
+for index, replica in enumerate(DB_REPLICAS, start=1):
+    replica_config = {
+        **DATABASES['default'],
+        'OPTIONS': dict(DATABASES['default'].get('OPTIONS', {})),
+        'TEST': {'MIRROR': 'default'},
+    }
+    if DB_ENGINE == 'mysql':
+        host, _, port = replica.partition(':')
+        replica_config.update(HOST=host, PORT=port or DB_PORT)
+    else:
+        replica_config['NAME'] = replica
+    DATABASES[f'replica_{index}'] = replica_config
+    DATABASE_REPLICAS.append(f'replica_{index}')
+
+DATABASE_ROUTERS = ['ez_request.db.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', '5'))
+
+# REST API (/api/v1/)
+# https://www.django-rest-framework.org/api-guide/settings/
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.IsAuthenticated',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'ez_request.api.NewestFirstCursorPagination',
+    'PAGE_SIZE': 20,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# cache (e.g. Redis or Memcached) when running more than one worker process.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'ez-request'),
+    },
+    # Full rendered pages for anonymous visitors; file-based works across processes
+    # (PAGE_CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache,
+    # PAGE_CACHE_LOCATION=/var/tmp/ez-request-pages)
+    'pages': {
+        'BACKEND': os.getenv('PAGE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('PAGE_CACHE_LOCATION', 'ez-request-pages'),
+    },
+}
+
+# Anonymous marketing pages (welcome/about/gallery/team): seconds cached, 0 disables.
+# Bump PAGE_CACHE_VERSION on deploy so template changes show up immediately.
+PAGE_CACHE_ALIAS = 'pages'
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', 600))
+PAGE_CACHE_VERSION = os.getenv('PAGE_CACHE_VERSION', '1')
+
+# Navbar links are fragment-cached per role (key also includes PAGE_CACHE_VERSION)
+NAVBAR_CACHE_TIMEOUT = int(os.getenv('NAVBAR_CACHE_TIMEOUT', 600))
+
+# Seconds the per-employee dashboard counters stay cached (invalidated on ServiceRequest save/delete)
+DASHBOARD_COUNTS_TIMEOUT = int(os.getenv('DASHBOARD_COUNTS_TIMEOUT', 300))
+
+# Approver dropdowns: cached per role; above the threshold the form switches to autocomplete
+APPROVER_DIRECTORY_TIMEOUT = int(os.getenv('APPROVER_DIRECTORY_TIMEOUT', 3600))
+APPROVER_AUTOCOMPLETE_THRESHOLD = int(os.getenv('APPROVER_AUTOCOMPLETE_THRESHOLD', 200))
+
+# Seconds an idle check_request simulation is kept in the cache (and its cookie lives)
+SIMULATION_STATE_TTL = int(os.getenv('SIMULATION_STATE_TTL', 7200))
+# Queued simulated requests kept per visitor; the oldest are evicted first
+SIMULATION_QUEUE_MAX = int(os.getenv('SIMULATION_QUEUE_MAX', 50))
 
 
 # Password validation
@@ -147,10 +253,41 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Responsive image variants written by collectstatic in the production profile
+# (ez_request/staticfiles.py) and used by {% responsive_image %}
+RESPONSIVE_IMAGE_DIRS = ('images/',)
+RESPONSIVE_IMAGE_WIDTHS = (320, 640, 960, 1280)
 
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Request attachments are streamed to MEDIA_ROOT in chunks of this size by
+# service_requests.uploads.AttachmentUploadHandler; per-type caps default to
+# uploads.DEFAULT_MAX_SIZES and can be overridden with ATTACHMENT_MAX_SIZES.
+ATTACHMENT_UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Who transfers attachment bytes after the permission check:
+# 'python' (default), 'nginx' (X-Accel-Redirect) or 'apache' (X-Sendfile).
+# See service_requests/sendfile.py for the matching web server config.
+ATTACHMENT_SENDFILE_BACKEND = os.getenv('ATTACHMENT_SENDFILE_BACKEND', 'python')
+ATTACHMENT_ACCEL_PREFIX = os.getenv('ATTACHMENT_ACCEL_PREFIX', '/protected-media/')
+
+# Attachment thumbnails are rendered after commit on this many background
+# threads (0 renders inline in the request). PDF previews need poppler's
+# pdftoppm on PATH; `generate_thumbnails` backfills existing attachments.
+ATTACHMENT_THUMBNAIL_WORKERS = int(os.getenv('ATTACHMENT_THUMBNAIL_WORKERS', '2'))
+ATTACHMENT_THUMBNAIL_SIZE = (320, 320)
+
+# Employee CSV imports from the web page run on this many background threads
+# per process (0 imports inline in the request, for tests); the page polls
+# the job's result, which is kept in the default cache, so production needs a
+# cache shared by all workers. Each import, and `manage.py import_employees`,
+# hashes passwords on EMPLOYEE_IMPORT_HASH_WORKERS processes (0 = one per CPU).
+EMPLOYEE_IMPORT_WORKERS = int(os.getenv('EMPLOYEE_IMPORT_WORKERS', '1'))
+EMPLOYEE_IMPORT_HASH_WORKERS = int(os.getenv('EMPLOYEE_IMPORT_HASH_WORKERS', '0'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
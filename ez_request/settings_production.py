@@ -0,0 +1,36 @@
+"""
+Production settings profile.
+
+Use with DJANGO_SETTINGS_MODULE=ez_request.settings_production; everything
+not overridden here comes from ez_request/settings.py (and the .env file).
+"""
+import os
+
+from ez_request.settings import *  # noqa: F401,F403
+from ez_request.settings import TEMPLATES
+
+DEBUG = False
+
+ALLOWED_HOSTS = [host.strip() for host in os.getenv('ALLOWED_HOSTS', '').split(',') if host.strip()]
+
+# Compile each template once per process instead of re-resolving it from the
+# app directories on every render. The loaders are listed explicitly so this
+# holds regardless of DEBUG; restart the workers to pick up template changes.
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS'] = {
+    **TEMPLATES[0]['OPTIONS'],
+    'debug': False,
+    'loaders': [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ],
+}
+
+# collectstatic writes content-hashed files (serve STATIC_ROOT with far-future
+# Cache-Control), .gz/.br siblings and responsive WebP/AVIF image variants.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'ez_request.staticfiles.OptimizedManifestStaticFilesStorage'},
+}
@@ -0,0 +1,168 @@
+"""
+collectstatic build step: content-hashed names, precompressed text assets and
+responsive image variants.
+
+Enabled in the production profile through STORAGES['staticfiles']. Running
+`python manage.py collectstatic` then
+
+1. renders resized WebP/AVIF copies of the raster images under
+   RESPONSIVE_IMAGE_DIRS (widths from
+   RESPONSIVE_IMAGE_WIDTHS, never upscaled) and records them, with the
+   original's dimensions, in `responsive-images.json`;
+2. writes every file under a content-hashed name (ManifestStaticFilesStorage),
+   so the web server can send far-future Cache-Control headers;
+3. stores `.gz` and `.br` siblings of hashed text assets for the web server
+   to send as-is (nginx `gzip_static on;` / `brotli_static on;`).
+
+Pillow and brotli are optional: without them the matching step is skipped.
+"""
+import gzip
+import io
+import json
+import posixpath
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+RESPONSIVE_INDEX = 'responsive-images.json'
+RASTER_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.mjs', '.json', '.svg', '.txt', '.xml', '.html', '.map', '.ico')
+# Below this size the compressed copy rarely saves a round trip
+MIN_COMPRESS_SIZE = 256
+
+# format -> Pillow save() options
+VARIANT_FORMATS = {
+    'avif': {'format': 'AVIF', 'quality': 55},
+    'webp': {'format': 'WEBP', 'quality': 78, 'method': 6},
+}
+
+
+def responsive_widths():
+    return sorted(getattr(settings, 'RESPONSIVE_IMAGE_WIDTHS', (320, 640, 960, 1280)))
+
+
+def responsive_dirs():
+    # Only our own photos; icons shipped by admin/DRF are left alone
+    return tuple(getattr(settings, 'RESPONSIVE_IMAGE_DIRS', ('images/',)))
+
+
+def variant_name(path, width, fmt):
+    root, _ = posixpath.splitext(path)
+    return f'{root}.{width}w.{fmt}'
+
+
+def supported_formats():
+    if Image is None:
+        return []
+    return [fmt for fmt in VARIANT_FORMATS if features.check(fmt)]
+
+
+def render_variants(content, formats, widths):
+    """
+    First yields the original (width, height, None), then (width, fmt, bytes)
+    for every target width smaller than the image plus the original width.
+    """
+    with Image.open(content) as source:
+        image = ImageOps.exif_transpose(source)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    width, height = image.size
+    yield width, height, None
+
+    for target in [w for w in widths if w < width] + [width]:
+        resized = image if target == width else image.resize(
+            (target, round(height * target / width)), Image.Resampling.LANCZOS
+        )
+        for fmt in formats:
+            buffer = io.BytesIO()
+            resized.save(buffer, **VARIANT_FORMATS[fmt])
+            yield target, fmt, buffer.getvalue()
+
+
+def compress(content):
+    """
+    Return {'.gz': bytes, '.br': bytes} for the encodings that actually help.
+    """
+    out = {}
+    gz = gzip.compress(content, compresslevel=9, mtime=0)
+    if len(gz) < len(content):
+        out['.gz'] = gz
+    if brotli is not None:
+        br = brotli.compress(content, quality=11)
+        if len(br) < len(content):
+            out['.br'] = br
+    return out
+
+
+class OptimizedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run, **options)
+            return
+
+        index = self.build_responsive_variants(paths)
+        yield from super().post_process(paths, dry_run, **options)
+
+        self._save(RESPONSIVE_INDEX, ContentFile(json.dumps(index, sort_keys=True).encode()))
+        for name in sorted(set(self.hashed_files.values())):
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            with self.open(name) as fh:
+                content = fh.read()
+            if len(content) < MIN_COMPRESS_SIZE:
+                continue
+            for suffix, data in compress(content).items():
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(data))
+                yield name, name + suffix, True
+
+    def build_responsive_variants(self, paths):
+        """
+        Write resized copies next to the collected originals and register them
+        in `paths` so they are hashed (and listed in the manifest) like any
+        other file. Returns the index written to RESPONSIVE_INDEX.
+        """
+        formats = supported_formats()
+        index = {}
+        if not formats:
+            return index
+        widths = responsive_widths()
+        for path in sorted(paths):
+            if not path.startswith(responsive_dirs()) or not path.lower().endswith(RASTER_EXTENSIONS):
+                continue
+            storage, source_path = paths[path]
+            with storage.open(source_path) as fh:
+                rendered = render_variants(fh, formats, widths)
+                width, height, _ = next(rendered)
+                entry = {'width': width, 'height': height, 'variants': {fmt: [] for fmt in formats}}
+                for target, fmt, data in rendered:
+                    name = variant_name(path, target, fmt)
+                    if self.exists(name):
+                        self.delete(name)
+                    self._save(name, ContentFile(data))
+                    paths[name] = (self, name)
+                    entry['variants'][fmt].append([name, target])
+            index[path] = entry
+        return index
+
+    def responsive_index(self):
+        if not hasattr(self, '_responsive_index'):
+            try:
+                with self.open(RESPONSIVE_INDEX) as fh:
+                    self._responsive_index = json.load(fh)
+            except (OSError, ValueError):
+                self._responsive_index = {}
+        return self._responsive_index
@@ -18,8 +18,6 @@ from django.contrib import admin
 from django.urls import path, include
 
 from users.views import welcome_view
-from django.conf import settings
-from django.conf.urls.static import static
 
 urlpatterns = [
     path('', welcome_view, name='home'), # Root URL points to welcome page
@@ -27,7 +25,8 @@ urlpatterns = [
     path('users/', include('users.urls')),
     path('employees/', include('employees.urls')),
     path('requests/', include('service_requests.urls')),
+    path('api/v1/', include('ez_request.api_urls')),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# MEDIA_ROOT only holds request attachments, which are served with access
+# checks by service_requests:attachment, so it is not exposed even in DEBUG.
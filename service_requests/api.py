@@ -0,0 +1,93 @@
+from django.db.models import Q
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+
+from ez_request.api import (
+    ConditionalGetMixin, NewestFirstCursorPagination, OldestFirstCursorPagination, RecentlyUpdatedCursorPagination,
+)
+from service_requests import approvals
+from service_requests.models import ServiceRequest
+from service_requests.serializers import DecisionSerializer, ServiceRequestSerializer
+
+
+class IsEmployee(permissions.BasePermission):
+    message = "You must be an employee to use this endpoint."
+
+    def has_permission(self, request, view):
+        return hasattr(request.user, 'employee')
+
+
+class ServiceRequestViewSet(ConditionalGetMixin,
+                            mixins.CreateModelMixin,
+                            mixins.ListModelMixin,
+                            mixins.RetrieveModelMixin,
+                            viewsets.GenericViewSet):
+    """
+    The logged-in employee's own requests (same rows as request_list_view).
+    """
+    serializer_class = ServiceRequestSerializer
+    permission_classes = [permissions.IsAuthenticated, IsEmployee]
+    pagination_class = NewestFirstCursorPagination
+    etag_timestamp_field = 'updated_at'
+
+    def get_queryset(self):
+        queryset = ServiceRequest.objects.filter(employee=self.request.user.employee).select_related('employee__user')
+        for param in ('status', 'request_type'):
+            value = self.request.query_params.get(param)
+            if value:
+                queryset = queryset.filter(**{param: value})
+        return queryset
+
+    def perform_create(self, serializer):
+        employee = self.request.user.employee
+        if employee.role not in ['KARYAWAN', 'MANAGER']:
+            raise PermissionDenied("Directors and Admins cannot submit requests.")
+        # If Manager is submitting, Manager Approval is Not Applicable
+        extra = {'manager_status': 'NA'} if employee.role == 'MANAGER' else {}
+        serializer.save(employee=employee, **extra)
+
+
+class ApprovalViewSet(ConditionalGetMixin,
+                      mixins.ListModelMixin,
+                      mixins.RetrieveModelMixin,
+                      viewsets.GenericViewSet):
+    """
+    Approval inbox: `list` is the pending queue, `history` the decided ones,
+    `decide` approves or rejects one request.
+    """
+    serializer_class = ServiceRequestSerializer
+    permission_classes = [permissions.IsAuthenticated, IsEmployee]
+    pagination_class = OldestFirstCursorPagination
+    etag_timestamp_field = 'updated_at'
+
+    def get_queryset(self):
+        employee = self.request.user.employee
+        if self.action == 'list':
+            queryset = ServiceRequest.objects.pending_for(employee)
+        elif self.action == 'history':
+            queryset = ServiceRequest.objects.history_for(employee)
+        else:
+            queryset = ServiceRequest.objects.filter(Q(manager_approver=employee) | Q(director_approver=employee))
+        return queryset.select_related('employee__user')
+
+    @action(detail=False, pagination_class=RecentlyUpdatedCursorPagination)
+    def history(self, request, *args, **kwargs):
+        return self.list(request, *args, **kwargs)
+
+    @action(detail=True, methods=['post'], serializer_class=DecisionSerializer)
+    def decide(self, request, pk=None):
+        service_request = self.get_object()
+        decision = DecisionSerializer(data=request.data)
+        decision.is_valid(raise_exception=True)
+
+        outcome = approvals.decide(
+            request.user.employee, service_request, decision.validated_data['action'], decision.validated_data['feedback']
+        )
+        if outcome not in (approvals.APPROVED, approvals.REJECTED):
+            return Response({'id': service_request.pk, 'outcome': outcome}, status=status.HTTP_409_CONFLICT)
+
+        service_request.refresh_from_db()
+        data = ServiceRequestSerializer(service_request, context=self.get_serializer_context()).data
+        return Response({'id': service_request.pk, 'outcome': outcome, 'request': data})
@@ -0,0 +1,167 @@
+from django.db import transaction
+from django.db.models import Case, F, Q, TextField, Value, When
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from service_requests.counters import invalidate_dashboard_counts
+from service_requests.models import ServiceRequest
+
+# Per-id outcomes returned by bulk_decide
+APPROVED = 'approved'
+REJECTED = 'rejected'
+NOT_FOUND = 'not_found'
+NOT_APPROVER = 'not_approver'
+ALREADY_PROCESSED = 'already_processed'
+WAITING_FOR_MANAGER = 'waiting_for_manager'
+
+DIRECTOR_READY = Q(manager_status='APPROVED') | Q(manager_status='NA') | Q(manager_approver__isnull=True)
+
+
+def manager_changes(status_val, feedback):
+    changes = {
+        'manager_status': status_val,
+        'feedback': f"Manager: {feedback}" if feedback else None,
+        'updated_at': timezone.now(),
+    }
+    if status_val == 'REJECTED':
+        changes['status'] = 'REJECTED'
+    return changes
+
+
+def director_changes(status_val, feedback):
+    changes = {
+        'director_status': status_val,
+        'status': status_val,  # Final status matches Director
+        'updated_at': timezone.now(),
+    }
+    if feedback:
+        # Append to any manager feedback, same as the single-request view
+        note = f"Director: {feedback}"
+        changes['feedback'] = Case(
+            When(Q(feedback__isnull=True) | Q(feedback=''), then=Value(note)),
+            default=Concat(F('feedback'), Value(f"\n{note}"), output_field=TextField()),
+            output_field=TextField(),
+        )
+    return changes
+
+
+def classify(row, employee):
+    """
+    Decide which step `employee` may take on `row` (a values() dict):
+    'manager', 'director', or an outcome constant explaining why not.
+    """
+    if row['manager_approver_id'] == employee.id:
+        if row['manager_status'] == 'PENDING':
+            return 'manager'
+        if row['director_approver_id'] != employee.id:
+            return ALREADY_PROCESSED
+    if row['director_approver_id'] == employee.id:
+        if row['director_status'] != 'PENDING':
+            return ALREADY_PROCESSED
+        if row['manager_status'] in ('APPROVED', 'NA') or row['manager_approver_id'] is None:
+            return 'director'
+        return WAITING_FOR_MANAGER
+    return NOT_APPROVER
+
+
+def decide(employee, service_request, action, feedback=''):
+    """
+    Approve or reject one request as a compare-and-set: the UPDATE only
+    matches while the step is still PENDING, so concurrent approvers or a
+    double-submitted form cannot overwrite each other, and no row lock is
+    held. Returns an outcome constant.
+    """
+    status_val = 'APPROVED' if action == 'approve' else 'REJECTED'
+    row = {
+        'manager_approver_id': service_request.manager_approver_id,
+        'manager_status': service_request.manager_status,
+        'director_approver_id': service_request.director_approver_id,
+        'director_status': service_request.director_status,
+    }
+    step = classify(row, employee)
+
+    if step == 'manager':
+        updated = ServiceRequest.objects.filter(
+            pk=service_request.pk, manager_approver=employee, manager_status='PENDING'
+        ).update(**manager_changes(status_val, feedback))
+    elif step == 'director':
+        updated = ServiceRequest.objects.filter(
+            DIRECTOR_READY, pk=service_request.pk, director_approver=employee, director_status='PENDING'
+        ).update(**director_changes(status_val, feedback))
+    else:
+        return step
+
+    if not updated:
+        # Lost the race: someone else decided between our read and our UPDATE
+        return ALREADY_PROCESSED
+
+    invalidate_dashboard_counts(
+        service_request.employee_id, service_request.manager_approver_id, service_request.director_approver_id
+    )
+    return APPROVED if status_val == 'APPROVED' else REJECTED
+
+
+def apply_step(pending, pks, changes):
+    """
+    One compare-and-set UPDATE of `pks` within `pending`. Returns the ids it
+    actually changed: when the row count comes up short, those are the rows
+    carrying this UPDATE's exact updated_at.
+    """
+    updated = pending.filter(pk__in=pks).update(**changes)
+    if updated == len(pks):
+        return pks
+    return list(
+        ServiceRequest.objects.filter(pk__in=pks, updated_at=changes['updated_at']).values_list('pk', flat=True)
+    )
+
+
+def bulk_decide(employee, ids, action, feedback=''):
+    """
+    Approve or reject many requests at once. Eligibility is checked with one
+    SELECT, and changes are applied with at most one UPDATE per approval step,
+    all inside a single transaction. Like decide(), each UPDATE is a
+    compare-and-set, so rows decided by someone else in the meantime come
+    back as ALREADY_PROCESSED. Returns {id: outcome}.
+    """
+    status_val = 'APPROVED' if action == 'approve' else 'REJECTED'
+    done = APPROVED if status_val == 'APPROVED' else REJECTED
+    ids = {int(pk) for pk in ids}
+    outcomes = {pk: NOT_FOUND for pk in ids}
+    if not ids:
+        return outcomes
+
+    with transaction.atomic():
+        rows = ServiceRequest.objects.select_for_update().filter(pk__in=ids).values(
+            'id', 'employee_id', 'manager_approver_id', 'manager_status', 'director_approver_id', 'director_status'
+        )
+        steps = {'manager': [], 'director': []}
+        touched = set()
+        for row in rows:
+            step = classify(row, employee)
+            if step in steps:
+                steps[step].append(row['id'])
+                touched.update((row['employee_id'], row['manager_approver_id'], row['director_approver_id']))
+            else:
+                outcomes[row['id']] = step
+
+        decided = set()
+        if steps['manager']:
+            decided.update(apply_step(
+                ServiceRequest.objects.filter(manager_approver=employee, manager_status='PENDING'),
+                steps['manager'], manager_changes(status_val, feedback),
+            ))
+        if steps['director']:
+            decided.update(apply_step(
+                ServiceRequest.objects.filter(DIRECTOR_READY, director_approver=employee, director_status='PENDING'),
+                steps['director'], director_changes(status_val, feedback),
+            ))
+
+        for pk in steps['manager'] + steps['director']:
+            # Lost the race: decided by someone else between our SELECT and
+            # UPDATE (select_for_update does not lock anything on SQLite)
+            outcomes[pk] = done if pk in decided else ALREADY_PROCESSED
+
+        # update() does not send post_save, so drop the cached dashboard counters here
+        invalidate_dashboard_counts(*touched)
+
+    return outcomes
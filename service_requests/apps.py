@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ServiceRequestsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'service_requests'
+
+    def ready(self):
+        from service_requests import signals  # noqa: F401
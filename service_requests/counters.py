@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Q
+
+from service_requests.models import ServiceRequest, pending_approval_q, approval_history_q
+
+CACHE_KEY = 'dashboard_counts:{employee_id}'
+
+
+def _cache_timeout():
+    return getattr(settings, 'DASHBOARD_COUNTS_TIMEOUT', 300)
+
+
+def compute_dashboard_counts(employee):
+    """
+    All per-role dashboard counters in a single conditional aggregation.
+    """
+    aggregates = {'total_requests_count': Count('id', filter=Q(employee=employee))}
+    scope = Q(employee=employee)
+
+    pending_q = pending_approval_q(employee)
+    history_q = approval_history_q(employee)
+    if pending_q is not None:
+        aggregates['pending_approvals_count'] = Count('id', filter=pending_q)
+        aggregates['total_history_count'] = Count('id', filter=history_q)
+        scope |= Q(manager_approver=employee) | Q(director_approver=employee)
+
+    # Cached until the next write invalidates it, so never from a lagging replica
+    counts = ServiceRequest.objects.using(DEFAULT_DB_ALIAS).filter(scope).aggregate(**aggregates)
+    counts.setdefault('pending_approvals_count', 0)
+    counts.setdefault('total_history_count', 0)
+    return counts
+
+
+def get_dashboard_counts(employee):
+    key = CACHE_KEY.format(employee_id=employee.pk)
+    counts = cache.get(key)
+    if counts is None:
+        counts = compute_dashboard_counts(employee)
+        cache.set(key, counts, _cache_timeout())
+    return counts
+
+
+def invalidate_dashboard_counts(*employee_ids):
+    """
+    Drop cached counters for every employee touched by a change, once it is
+    committed: dropping them earlier lets a concurrent dashboard cache the
+    old counts again before the commit. Call this after queryset.update(),
+    which does not send save signals.
+    """
+    keys = [CACHE_KEY.format(employee_id=pk) for pk in set(employee_ids) if pk]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
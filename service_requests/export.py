@@ -0,0 +1,120 @@
+import csv
+import datetime
+import json
+
+from django.db import connection
+from django.utils import timezone
+
+from service_requests.models import ServiceRequest
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+# Spreadsheets run cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# (column, ORM lookup) in output order
+COLUMNS = [
+    ('id', 'id'),
+    ('request_type', 'request_type'),
+    ('title', 'title'),
+    ('status', 'status'),
+    ('amount', 'amount'),
+    ('start_date', 'start_date'),
+    ('end_date', 'end_date'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+    ('employee', 'employee__user__username'),
+    ('manager_approver', 'manager_approver__user__username'),
+    ('manager_status', 'manager_status'),
+    ('director_approver', 'director_approver__user__username'),
+    ('director_status', 'director_status'),
+]
+
+
+def _day_start(value):
+    return timezone.make_aware(datetime.datetime.combine(value, datetime.time.min))
+
+
+def export_queryset(request_type=None, status=None, date_from=None, date_to=None):
+    """
+    Rows to export, filtered on type/status and an inclusive created_at date range.
+    """
+    qs = ServiceRequest.objects.all()
+    if request_type:
+        qs = qs.filter(request_type=request_type)
+    if status:
+        qs = qs.filter(status=status)
+    # Plain range on created_at (not __date) so the column index can be used
+    if date_from:
+        qs = qs.filter(created_at__gte=_day_start(date_from))
+    if date_to:
+        qs = qs.filter(created_at__lt=_day_start(date_to + datetime.timedelta(days=1)))
+    return qs
+
+
+def iter_rows(qs, chunk_size=2000):
+    """
+    Yield export rows as tuples with memory bounded by `chunk_size`.
+
+    MySQL's driver buffers the whole result even with .iterator(), so there
+    we walk the table in keyset batches on id instead.
+    """
+    qs = qs.order_by('id').values_list(*[lookup for _, lookup in COLUMNS])
+    if connection.vendor != 'mysql':
+        yield from qs.iterator(chunk_size=chunk_size)
+        return
+
+    last_id = 0
+    while True:
+        batch = list(qs.filter(id__gt=last_id)[:chunk_size])
+        if not batch:
+            return
+        yield from batch
+        last_id = batch[-1][0]
+
+
+def _plain(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if value is None:
+        return ''
+    return str(value) if not isinstance(value, (int, str)) else value
+
+
+def _cell(value):
+    """
+    A CSV cell; free text that a spreadsheet would run as a formula
+    (=HYPERLINK(...), +cmd|...) is prefixed with a quote. Numbers and
+    dates are left alone, so negative amounts stay numeric.
+    """
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return _plain(value)
+
+
+class Echo:
+    """
+    File-like object whose write() just returns the line, for csv.writer.
+    """
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _ in COLUMNS])
+    for row in rows:
+        yield writer.writerow([_cell(value) for value in row])
+
+
+def ndjson_lines(rows):
+    names = [name for name, _ in COLUMNS]
+    for row in rows:
+        record = {name: (None if value is None else _plain(value)) for name, value in zip(names, row)}
+        yield json.dumps(record) + '\n'
+
+
+def export_lines(qs, export_format='csv', chunk_size=2000):
+    rows = iter_rows(qs, chunk_size)
+    return ndjson_lines(rows) if export_format == 'ndjson' else csv_lines(rows)
@@ -1,8 +1,60 @@
 from django import forms
+from django.conf import settings
+from django.forms.models import ModelChoiceIterator, ModelChoiceIteratorValue
+from django.urls import reverse
 from service_requests.models import ServiceRequest
 from employees.models import Employee
+from employees.directory import get_approver_choices
+
+
+class ApproverChoiceIterator(ModelChoiceIterator):
+    """
+    Yields options from the cached approver directory instead of evaluating
+    the queryset and calling Employee.__str__ (one user query per option).
+    """
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for pk, label in self.field.directory_choices():
+            yield (ModelChoiceIteratorValue(pk, None), label)
+
+    def __len__(self):
+        return len(self.field.directory_choices()) + (1 if self.field.empty_label is not None else 0)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.field.directory_choices())
+
+
+class ApproverChoiceField(forms.ModelChoiceField):
+    """
+    Employee picker for a single role. In autocomplete mode (large orgs) only
+    the selected option is rendered; the rest are fetched from employees:approvers.
+    """
+    iterator = ApproverChoiceIterator
+
+    def __init__(self, role, **kwargs):
+        self.role = role
+        self.autocomplete = False
+        self.selected_pks = set()
+        super().__init__(queryset=Employee.objects.filter(role=role), **kwargs)
+
+    def directory_choices(self):
+        choices = get_approver_choices(self.role)
+        if self.autocomplete:
+            return [(pk, label) for pk, label in choices if str(pk) in self.selected_pks]
+        return choices
+
+    def enable_autocomplete(self, selected=None):
+        self.autocomplete = True
+        self.selected_pks = {str(selected)} if selected not in (None, '') else set()
+        self.widget.attrs['data-autocomplete-url'] = f"{reverse('employees:approvers')}?role={self.role}"
+
 
 class ServiceRequestForm(forms.ModelForm):
+    manager_approver = ApproverChoiceField(role='MANAGER', required=False, widget=forms.Select(attrs={'class': 'form-select'}))
+    director_approver = ApproverChoiceField(role='DIREKTUR', required=False, widget=forms.Select(attrs={'class': 'form-select'}))
+
     class Meta:
         model = ServiceRequest
         fields = ['request_type', 'title', 'description', 'amount', 'start_date', 'end_date', 'attachment', 'manager_approver', 'director_approver']
@@ -14,12 +66,12 @@ class ServiceRequestForm(forms.ModelForm):
             'start_date': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
             'end_date': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
             'attachment': forms.FileInput(attrs={'class': 'form-control'}),
-            'manager_approver': forms.Select(attrs={'class': 'form-select'}),
-            'director_approver': forms.Select(attrs={'class': 'form-select'}),
         }
     
     def __init__(self, *args, **kwargs):
         user = kwargs.pop('user', None)
+        # Set by AttachmentUploadHandler when it rejected the file mid-upload
+        self.upload_error = kwargs.pop('upload_error', None)
         super().__init__(*args, **kwargs)
         
         if user and hasattr(user, 'employee'):
@@ -34,8 +86,6 @@ class ServiceRequestForm(forms.ModelForm):
                 ]
                 
                 # Must select Manager AND Director
-                self.fields['manager_approver'].queryset = Employee.objects.filter(role='MANAGER')
-                self.fields['director_approver'].queryset = Employee.objects.filter(role='DIREKTUR')
                 self.fields['manager_approver'].required = True
                 self.fields['director_approver'].required = True
                 
@@ -44,9 +94,22 @@ class ServiceRequestForm(forms.ModelForm):
                 self.fields['manager_approver'].widget = forms.HiddenInput()
                 self.fields['manager_approver'].required = False
                 
-                self.fields['director_approver'].queryset = Employee.objects.filter(role='DIREKTUR')
                 self.fields['director_approver'].required = True
 
+        # Large orgs: don't ship every approver in the HTML, search them instead
+        threshold = getattr(settings, 'APPROVER_AUTOCOMPLETE_THRESHOLD', 200)
+        for name in ('manager_approver', 'director_approver'):
+            field = self.fields[name]
+            if isinstance(field.widget, forms.HiddenInput):
+                continue
+            if len(get_approver_choices(field.role)) > threshold:
+                field.enable_autocomplete(self[name].value())
+
+    def clean_attachment(self):
+        if self.upload_error:
+            raise forms.ValidationError(self.upload_error)
+        return self.cleaned_data.get('attachment')
+
     def clean(self):
         cleaned_data = super().clean()
         request_type = cleaned_data.get('request_type')
@@ -65,3 +128,28 @@ class ServiceRequestForm(forms.ModelForm):
                 self.add_error('end_date', 'End date cannot be before start date.')
         
         return cleaned_data
+
+
+class RequestExportForm(forms.Form):
+    format = forms.ChoiceField(choices=[('csv', 'CSV'), ('ndjson', 'NDJSON')], required=False)
+    type = forms.ChoiceField(choices=(('', 'All'),) + ServiceRequest.REQUEST_TYPES, required=False)
+    status = forms.ChoiceField(choices=(('', 'All'),) + ServiceRequest.STATUS_CHOICES, required=False)
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get('date_from')
+        date_to = cleaned_data.get('date_to')
+        if date_from and date_to and date_to < date_from:
+            self.add_error('date_to', 'End date cannot be before start date.')
+        cleaned_data['format'] = cleaned_data.get('format') or 'csv'
+        return cleaned_data
+
+    def export_filters(self):
+        return {
+            'request_type': self.cleaned_data.get('type') or None,
+            'status': self.cleaned_data.get('status') or None,
+            'date_from': self.cleaned_data.get('date_from'),
+            'date_to': self.cleaned_data.get('date_to'),
+        }
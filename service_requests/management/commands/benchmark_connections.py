@@ -0,0 +1,158 @@
+import copy
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.db.utils import load_backend
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from employees.models import Employee
+from ez_request.db.pool import close_pools, get_pool
+from service_requests.management.commands.benchmark_urls import percentile
+
+URL_NAMES = ['users:dashboard', 'service_requests:approvals']
+
+POOLED_ENGINES = {
+    'django.db.backends.mysql': 'ez_request.db.backends.mysql',
+    'django.db.backends.sqlite3': 'ez_request.db.backends.sqlite3',
+}
+PLAIN_ENGINES = {pooled: plain for plain, pooled in POOLED_ENGINES.items()}
+
+
+def profile_settings(base, profile, pool_size):
+    """
+    DATABASES['default'] for one profile: a new connection per request,
+    persistent connections per thread, or the per-process pool.
+    """
+    cfg = copy.deepcopy(base)
+    options = cfg.setdefault('OPTIONS', {})
+    options.pop('pool', None)
+    cfg['ENGINE'] = PLAIN_ENGINES.get(cfg['ENGINE'], cfg['ENGINE'])
+    cfg['CONN_HEALTH_CHECKS'] = True
+    if profile == 'fresh':
+        cfg['CONN_MAX_AGE'] = 0
+    elif profile == 'persistent':
+        cfg['CONN_MAX_AGE'] = 600
+    else:
+        cfg['ENGINE'] = POOLED_ENGINES[cfg['ENGINE']]
+        cfg['CONN_MAX_AGE'] = 0
+        options['pool'] = {'max_size': pool_size}
+    return cfg
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec of the dashboard and approval inbox with a new "
+        "database connection per request, persistent connections and the "
+        "connection pool, and report the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per view, profile and thread')
+        parser.add_argument('--threads', type=int, default=1, help='Concurrent clients')
+        parser.add_argument('--pool-size', type=int, default=4)
+        parser.add_argument('--profiles', nargs='*', default=['fresh', 'persistent', 'pooled'], choices=['fresh', 'persistent', 'pooled'])
+        parser.add_argument('--output', default=None, help='Write JSON here instead of stdout')
+
+    def handle(self, *args, **options):
+        base = settings.DATABASES['default']
+        if PLAIN_ENGINES.get(base['ENGINE'], base['ENGINE']) not in POOLED_ENGINES:
+            raise CommandError(f"No pooled backend for {base['ENGINE']}")
+        manager = (
+            Employee.objects.filter(role='MANAGER', manager_requests__isnull=False)
+            .select_related('user').first()
+        )
+        if manager is None:
+            raise CommandError('Needs a manager with requests; run seed_perf_data first.')
+        urls = [reverse(name) for name in URL_NAMES]
+
+        connects = []
+        connection_created.connect(lambda **kwargs: connects.append(1), weak=False, dispatch_uid='benchmark_connections')
+        original = connections['default']
+        original.close()
+        results = []
+        try:
+            # The test client talks to 'testserver'
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                for profile in options['profiles']:
+                    cfg = profile_settings(base, profile, options['pool_size'])
+                    for name, url in zip(URL_NAMES, urls):
+                        close_pools()
+                        connects.clear()
+                        row = self.measure(cfg, manager.user, url, options['requests'], options['threads'])
+                        # connection_created also fires for connections handed out by the pool
+                        opened = get_pool('default', {}).misses if profile == 'pooled' else len(connects)
+                        row.update(profile=profile, name=name, connections_opened=opened)
+                        results.append(row)
+                        self.stderr.write(f"{profile:<10} {name:<32} {row['rps']:>8.1f} req/s  opened={opened}")
+        finally:
+            connection_created.disconnect(dispatch_uid='benchmark_connections')
+            close_pools()
+            connections['default'] = original
+
+        report = json.dumps({
+            'vendor': original.vendor,
+            'requests': options['requests'],
+            'threads': options['threads'],
+            'pool_size': options['pool_size'],
+            'results': results,
+        }, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(report)
+        else:
+            self.stdout.write(report)
+
+    def measure(self, cfg, user, url, requests, threads):
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        started = []
+        # Timing starts once every client is logged in and warmed up
+        barrier = threading.Barrier(threads, action=lambda: started.append(time.perf_counter()))
+
+        def client_thread():
+            # Connections are per thread; give this one a wrapper for the profile
+            connections['default'] = load_backend(cfg['ENGINE']).DatabaseWrapper(copy.deepcopy(cfg), 'default')
+            try:
+                client = Client()
+                client.force_login(user)
+                client.get(url)
+                close_old_connections()
+                own = []
+                barrier.wait()
+                for _ in range(requests):
+                    start = time.perf_counter()
+                    # What the WSGI handler does around every request
+                    close_old_connections()
+                    client.get(url)
+                    close_old_connections()
+                    own.append((time.perf_counter() - start) * 1000)
+            except Exception as exc:
+                barrier.abort()
+                errors.append(exc)
+                return
+            finally:
+                connections['default'].close()
+            with lock:
+                latencies.extend(own)
+
+        workers = [threading.Thread(target=client_thread) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if errors:
+            raise CommandError(f'Benchmark client failed: {errors[0]!r}')
+        elapsed = time.perf_counter() - started[0]
+        latencies.sort()
+        return {
+            'rps': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+        }
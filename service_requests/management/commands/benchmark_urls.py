@@ -0,0 +1,161 @@
+import json
+import statistics
+import time
+from contextlib import ExitStack
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.db.models import Count, Q
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from employees import urls as employees_urls
+from employees.models import Employee
+from service_requests import urls as service_requests_urls
+from service_requests.models import ServiceRequest
+from users import urls as users_urls
+
+ROLES = ['ANONYMOUS', 'KARYAWAN', 'MANAGER', 'DIREKTUR', 'ADMIN']
+
+# Would end the benchmark session
+SKIP = {'users:logout'}
+
+# Query strings for views that need parameters to do real work
+QUERY_STRINGS = {
+    'employees:approvers': 'role=MANAGER&q=a',
+}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = "GET every named URL in users, employees and service_requests as each role and report latency/query stats as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Requests per URL and role')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per URL and role')
+        parser.add_argument('--roles', nargs='*', default=ROLES, choices=ROLES)
+        parser.add_argument('--prefix', default=None, help='Only benchmark as users whose username starts with this (e.g. perf_)')
+        parser.add_argument('--output', default=None, help='Write JSON here instead of stdout')
+
+    def handle(self, *args, **options):
+        results = []
+        # The test client talks to 'testserver'
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            for role in options['roles']:
+                employee = None
+                if role != 'ANONYMOUS':
+                    employee = self.pick_employee(role, options['prefix'])
+                    if employee is None:
+                        self.stderr.write(f'No {role} employee found, skipping.')
+                        continue
+
+                client = Client()
+                if employee:
+                    client.force_login(employee.user)
+
+                for name, url in self.urls_for(employee):
+                    results.append(self.measure(client, role, name, url, options['iterations'], options['warmup']))
+                    self.stderr.write(f"{role:<10} {name:<30} p50={results[-1]['p50_ms']:.1f}ms queries={results[-1]['queries_mean']:.1f}")
+
+        report = json.dumps({'iterations': options['iterations'], 'vendor': connection.vendor, 'results': results}, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(report)
+        else:
+            self.stdout.write(report)
+
+    def pick_employee(self, role, prefix):
+        qs = Employee.objects.filter(role=role).select_related('user')
+        if prefix:
+            qs = qs.filter(user__username__startswith=prefix)
+        if role in ('MANAGER', 'DIREKTUR'):
+            # Prefer the approver with the busiest inbox, that's the interesting case
+            related, status = ('manager_requests', 'manager_status') if role == 'MANAGER' else ('director_requests', 'director_status')
+            busiest = (
+                qs.annotate(pending=Count(related, filter=Q(**{f'{related}__{status}': 'PENDING'})))
+                .filter(pending__gt=0).order_by('-pending', 'id').values_list('id', flat=True)[:1]
+            )
+            if busiest:
+                return qs.get(pk=busiest[0])
+        if role == 'KARYAWAN':
+            with_requests = qs.filter(requests__isnull=False).values_list('id', flat=True)[:1]
+            if with_requests:
+                return qs.get(pk=with_requests[0])
+        return qs.first()
+
+    def url_kwargs(self, name, employee):
+        if employee is None:
+            return None
+        if name in ('users:update', 'users:delete'):
+            return {'pk': employee.user_id}
+        if name in ('employees:update', 'employees:delete'):
+            return {'pk': employee.pk}
+        if name in ('service_requests:delete', 'service_requests:approve'):
+            pk = ServiceRequest.objects.filter(employee=employee).values_list('pk', flat=True).first()
+            return {'pk': pk} if pk else None
+        return None
+
+    def urls_for(self, employee):
+        for module in (users_urls, employees_urls, service_requests_urls):
+            for pattern in module.urlpatterns:
+                if not isinstance(pattern, URLPattern) or not pattern.name:
+                    continue
+                name = f'{module.app_name}:{pattern.name}'
+                if name in SKIP:
+                    continue
+                if pattern.pattern.converters:
+                    kwargs = self.url_kwargs(name, employee)
+                    if kwargs is None:
+                        continue
+                    url = reverse(name, kwargs=kwargs)
+                else:
+                    url = reverse(name)
+                if name in QUERY_STRINGS:
+                    url = f'{url}?{QUERY_STRINGS[name]}'
+                yield name, url
+
+    def measure(self, client, role, name, url, iterations, warmup):
+        for _ in range(warmup):
+            response = client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+
+        latencies = []
+        queries = []
+        status = None
+        started = time.perf_counter()
+        for _ in range(iterations):
+            # Every alias, so reads routed to a replica are counted too
+            with ExitStack() as stack:
+                contexts = [stack.enter_context(CaptureQueriesContext(db)) for db in connections.all()]
+                start = time.perf_counter()
+                response = client.get(url)
+                if response.streaming:
+                    # A streamed body (e.g. the CSV export) runs its queries as it is read
+                    b''.join(response.streaming_content)
+                latencies.append((time.perf_counter() - start) * 1000)
+            queries.append(sum(len(ctx.captured_queries) for ctx in contexts))
+            status = response.status_code
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+
+        return {
+            'role': role,
+            'name': name,
+            'url': url,
+            'status': status,
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'queries_mean': round(statistics.fmean(queries), 2),
+            'queries_max': max(queries),
+            'throughput_rps': round(iterations / elapsed, 2) if elapsed else None,
+        }
@@ -0,0 +1,101 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from service_requests.models import ServiceRequest
+from service_requests.storage import (
+    RELEASE_GRACE_SECONDS, attachment_storage, content_name, is_content_addressed,
+)
+from service_requests.thumbnails import THUMBNAIL_SUFFIX
+
+UPLOAD_DIR = ServiceRequest._meta.get_field('attachment').upload_to.rstrip('/')
+
+
+class Command(BaseCommand):
+    help = (
+        "Move existing attachments to content-addressed names so identical files "
+        "are stored once, repoint the rows and delete the redundant copies."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would change')
+        parser.add_argument(
+            '--prune', action='store_true',
+            help='Also delete files under the attachment folder that no request references',
+        )
+
+    def handle(self, *args, **options):
+        storage = attachment_storage()
+        dry_run = options['dry_run']
+        moved = rows = freed = missing = 0
+        targets = set()
+
+        names = (
+            ServiceRequest.objects.exclude(attachment__isnull=True).exclude(attachment='')
+            .order_by('attachment').values_list('attachment', flat=True).distinct()
+        )
+        for name in names.iterator():
+            if is_content_addressed(name):
+                continue
+            if not storage.exists(name):
+                missing += 1
+                self.stderr.write(f'Missing file: {name}')
+                continue
+
+            target = content_name(os.path.dirname(name), storage.hash_file(name), name)
+            size = storage.size(name)
+            duplicate = target in targets or storage.exists(target)
+            targets.add(target)
+            if not dry_run:
+                if not duplicate:
+                    # Saving under the old name makes the storage derive `target` itself
+                    with storage.open(name) as fh:
+                        storage.save(name, fh)
+                with transaction.atomic():
+                    rows += ServiceRequest.objects.filter(attachment=name).update(attachment=target)
+                storage.delete(name)
+            moved += 1
+            if duplicate:
+                freed += size
+            self.stdout.write(f"{'Would move' if dry_run else 'Moved'} {name} -> {target}{' (duplicate)' if duplicate else ''}")
+
+        if options['prune']:
+            freed += self.prune(storage, dry_run)
+
+        prefix = '[dry run] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}Files moved: {moved}, rows updated: {rows}, missing: {missing}, bytes freed: {freed}'
+        ))
+
+    def prune(self, storage, dry_run):
+        """
+        Delete unreferenced files (legacy copies, released blobs and their
+        thumbnails) under UPLOAD_DIR.
+        """
+        referenced = set(
+            ServiceRequest.objects.exclude(attachment__isnull=True).exclude(attachment='')
+            .values_list('attachment', flat=True).distinct().iterator()
+        )
+        freed = 0
+        cutoff = time.time() - RELEASE_GRACE_SECONDS
+        for name in self.walk(storage, UPLOAD_DIR):
+            if name in referenced or os.path.getmtime(storage.path(name)) > cutoff:
+                continue
+            if name.endswith(THUMBNAIL_SUFFIX) and name[:-len(THUMBNAIL_SUFFIX)] in referenced:
+                continue
+            freed += storage.size(name)
+            self.stdout.write(f"{'Would delete' if dry_run else 'Deleted'} unreferenced {name}")
+            if not dry_run:
+                storage.delete(name)
+        return freed
+
+    def walk(self, storage, directory):
+        if not storage.exists(directory):
+            return
+        subdirs, files = storage.listdir(directory)
+        for filename in files:
+            yield f'{directory}/{filename}'
+        for subdir in subdirs:
+            yield from self.walk(storage, f'{directory}/{subdir}')
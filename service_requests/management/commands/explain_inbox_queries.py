@@ -0,0 +1,136 @@
+import datetime
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from employees.models import Employee
+from service_requests.models import ServiceRequest
+from users.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Seed sample data and print EXPLAIN output plus timings for every approval inbox query."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000, help='Number of ServiceRequest rows to seed (0 = use existing data)')
+        parser.add_argument('--approvers', type=int, default=20, help='Number of managers and directors to seed')
+        parser.add_argument('--repeat', type=int, default=20, help='Timing iterations per query')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows instead of rolling them back')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                manager, director, employee = self.seed(options)
+                self.report(manager, director, employee, options['repeat'])
+                if not options['keep']:
+                    raise Rollback()
+        except Rollback:
+            self.stdout.write(self.style.WARNING('Seeded rows rolled back.'))
+
+    def seed(self, options):
+        if options['requests'] <= 0:
+            return (
+                Employee.objects.filter(role='MANAGER').first(),
+                Employee.objects.filter(role='DIREKTUR').first(),
+                Employee.objects.filter(role='KARYAWAN').first(),
+            )
+
+        today = datetime.date.today()
+        tag = int(time.time())
+
+        def make_employees(role, count):
+            prefix = f'explain_{role.lower()}_{tag}_'
+            # Re-read after bulk_create: MySQL does not return primary keys
+            User.objects.bulk_create([User(username=f'{prefix}{i}') for i in range(count)])
+            Employee.objects.bulk_create([
+                Employee(user=u, role=role, position=role.title(), department='Bench', phone='0', date_hired=today)
+                for u in User.objects.filter(username__startswith=prefix)
+            ])
+            return list(Employee.objects.filter(user__username__startswith=prefix))
+
+        managers = make_employees('MANAGER', options['approvers'])
+        directors = make_employees('DIREKTUR', options['approvers'])
+        staff = make_employees('KARYAWAN', options['approvers'] * 5)
+
+        statuses = ['PENDING', 'APPROVED', 'REJECTED']
+        rows = []
+        for i in range(options['requests']):
+            manager_status = random.choice(statuses)
+            director_status = random.choice(statuses) if manager_status == 'APPROVED' else 'PENDING'
+            rows.append(ServiceRequest(
+                employee=random.choice(staff),
+                request_type=random.choice(['PROPOSAL', 'REIMBURSEMENT', 'LEAVE']),
+                title=f'Explain seed {i}',
+                description='Seeded by explain_inbox_queries',
+                manager_approver=random.choice(managers),
+                director_approver=random.choice(directors),
+                manager_status=manager_status,
+                director_status=director_status,
+            ))
+        ServiceRequest.objects.bulk_create(rows, batch_size=1000)
+        self.stdout.write(f'Seeded {len(rows)} requests on {connection.vendor}.')
+        return managers[0], directors[0], staff[0]
+
+    def inbox_queries(self, manager, director, employee):
+        queries = []
+        if employee:
+            queries.append(('my requests', ServiceRequest.objects.filter(employee=employee).order_by('-created_at', '-id')[:11]))
+            queries.append(('my requests count', ServiceRequest.objects.filter(employee=employee)))
+        for label, approver in (('manager', manager), ('director', director)):
+            if not approver:
+                continue
+            queries.append((f'{label} pending', ServiceRequest.objects.pending_for(approver).order_by('created_at', 'id')[:11]))
+            queries.append((f'{label} pending count', ServiceRequest.objects.pending_for(approver)))
+            queries.append((f'{label} history', ServiceRequest.objects.history_for(approver).order_by('-updated_at', '-id')[:11]))
+            queries.append((f'{label} history count', ServiceRequest.objects.history_for(approver)))
+        return queries
+
+    def is_full_scan(self, plan):
+        table = ServiceRequest._meta.db_table
+        if connection.vendor == 'sqlite':
+            return any(
+                f'SCAN {table}' in line and 'USING' not in line
+                for line in plan.splitlines()
+            )
+        if connection.vendor == 'mysql':
+            return '"access_type": "ALL"' in plan
+        return False
+
+    def report(self, manager, director, employee, repeat):
+        explain_options = {'format': 'JSON'} if connection.vendor == 'mysql' else {}
+        full_scans = 0
+
+        for label, qs in self.inbox_queries(manager, director, employee):
+            is_count = label.endswith('count')
+            plan_qs = qs if not is_count else qs.values('id')
+            plan = plan_qs.explain(**explain_options)
+
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                qs.count() if is_count else list(qs.all())
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+
+            full_scan = self.is_full_scan(plan)
+            full_scans += full_scan
+            self.stdout.write(self.style.MIGRATE_HEADING(f'== {label} =='))
+            self.stdout.write(plan if connection.vendor != 'mysql' else json.dumps(json.loads(plan), indent=2))
+            self.stdout.write(
+                f'min {timings[0]:.2f} ms | median {timings[len(timings) // 2]:.2f} ms | max {timings[-1]:.2f} ms'
+            )
+            if full_scan:
+                self.stdout.write(self.style.ERROR('FULL TABLE SCAN'))
+            self.stdout.write('')
+
+        if full_scans:
+            self.stdout.write(self.style.ERROR(f'{full_scans} inbox queries use a full table scan.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No inbox query uses a full table scan.'))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from service_requests.export import export_lines, export_queryset
+from service_requests.forms import RequestExportForm
+
+
+class Command(BaseCommand):
+    help = "Stream service requests (with approver names) to CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', default='csv', choices=['csv', 'ndjson'])
+        parser.add_argument('--type', default='', help='PROPOSAL, REIMBURSEMENT or LEAVE')
+        parser.add_argument('--status', default='', help='PENDING, APPROVED or REJECTED')
+        parser.add_argument('--from', dest='date_from', default='', help='Created on or after (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', default='', help='Created on or before (YYYY-MM-DD)')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--output', default=None, help='File to write (default: stdout)')
+
+    def handle(self, *args, **options):
+        form = RequestExportForm({
+            'format': options['format'],
+            'type': options['type'],
+            'status': options['status'],
+            'date_from': options['date_from'],
+            'date_to': options['date_to'],
+        })
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+
+        qs = export_queryset(**form.export_filters())
+        lines = export_lines(qs, form.cleaned_data['format'], options['chunk_size'])
+
+        out = open(options['output'], 'w', newline='') if options['output'] else self.stdout
+        try:
+            for line in lines:
+                out.write(line)
+        finally:
+            if options['output']:
+                out.close()
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from service_requests.models import ServiceRequest
+from service_requests.storage import attachment_storage
+from service_requests.thumbnails import can_render, generate_thumbnail, thumbnail_name
+
+
+class Command(BaseCommand):
+    help = "Render missing thumbnails for existing request attachments."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be rendered')
+
+    def handle(self, *args, **options):
+        storage = attachment_storage()
+        dry_run = options['dry_run']
+        rendered = skipped = failed = 0
+
+        names = (
+            ServiceRequest.objects.exclude(attachment__isnull=True).exclude(attachment='')
+            .order_by('attachment').values_list('attachment', flat=True).distinct()
+        )
+        for name in names.iterator():
+            if not can_render(name) or storage.exists(thumbnail_name(name)):
+                skipped += 1
+                continue
+            if dry_run:
+                self.stdout.write(f'Would render {thumbnail_name(name)}')
+                rendered += 1
+            elif generate_thumbnail(storage, name):
+                self.stdout.write(f'Rendered {thumbnail_name(name)}')
+                rendered += 1
+            else:
+                failed += 1
+                self.stderr.write(f'Could not render a thumbnail for {name}')
+
+        prefix = '[dry run] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}Thumbnails rendered: {rendered}, skipped: {skipped}, failed: {failed}'
+        ))
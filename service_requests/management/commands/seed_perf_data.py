@@ -0,0 +1,157 @@
+import datetime
+import random
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from employees.models import Employee
+from service_requests.models import ServiceRequest
+from users.models import User
+
+# Share of seeded employees per role
+ROLE_WEIGHTS = {'KARYAWAN': 0.86, 'MANAGER': 0.10, 'DIREKTUR': 0.03, 'ADMIN': 0.01}
+TYPE_WEIGHTS = {'REIMBURSEMENT': 0.5, 'LEAVE': 0.4, 'PROPOSAL': 0.1}
+
+
+@contextmanager
+def explicit_timestamps():
+    """
+    Let bulk_create keep our spread-out created_at/updated_at values instead
+    of stamping every row with now().
+    """
+    fields = [ServiceRequest._meta.get_field('created_at'), ServiceRequest._meta.get_field('updated_at')]
+    saved = [(f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, (auto_now, auto_now_add) in zip(fields, saved):
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+def weighted(weights):
+    return random.choices(list(weights), weights=list(weights.values()))[0]
+
+
+class Command(BaseCommand):
+    help = "Bulk-create synthetic users, employees and service requests for performance testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000, help='Number of User/Employee rows')
+        parser.add_argument('--requests', type=int, default=1000000, help='Number of ServiceRequest rows')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--days', type=int, default=730, help='Spread created_at over this many past days')
+        parser.add_argument('--prefix', default='perf', help='Username prefix for seeded users')
+        parser.add_argument('--password', default='perf-password', help='Password set on every seeded user')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
+
+    def handle(self, *args, **options):
+        if options['seed'] is not None:
+            random.seed(options['seed'])
+
+        by_role = self.seed_employees(options)
+        self.seed_requests(options, by_role)
+
+        # bulk_create skips save signals, so cached counters/directories are stale
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS('Done.'))
+
+    def seed_employees(self, options):
+        prefix = f"{options['prefix']}_"
+        batch_size = options['batch_size']
+        password = make_password(options['password'])  # hash once, not per user
+        today = datetime.date.today()
+        start = User.objects.filter(username__startswith=prefix).count()
+
+        roles = [weighted(ROLE_WEIGHTS) for _ in range(options['users'])]
+        # Every role must exist for the inbox queries to have something to do
+        for i, role in enumerate(ROLE_WEIGHTS):
+            if i < len(roles):
+                roles[i] = role
+
+        for offset in range(0, len(roles), batch_size):
+            chunk = roles[offset:offset + batch_size]
+            names = [f'{prefix}{start + offset + i}' for i in range(len(chunk))]
+            User.objects.bulk_create([
+                User(username=name, first_name='Perf', last_name=str(start + offset + i), password=password)
+                for i, name in enumerate(names)
+            ], batch_size=batch_size)
+            # Re-read ids (MySQL does not return them from bulk_create)
+            user_ids = dict(User.objects.filter(username__in=names).values_list('username', 'id'))
+            Employee.objects.bulk_create([
+                Employee(
+                    user_id=user_ids[name], role=role, position=role.title(), department=f'Dept {i % 20}',
+                    phone='0800000000', date_hired=today - datetime.timedelta(days=random.randint(0, 3650)),
+                )
+                for i, (name, role) in enumerate(zip(names, chunk))
+            ], batch_size=batch_size)
+            self.stdout.write(f'  employees: {offset + len(chunk)}/{len(roles)}')
+
+        by_role = {role: [] for role in ROLE_WEIGHTS}
+        for pk, role in Employee.objects.filter(user__username__startswith=prefix).values_list('id', 'role'):
+            by_role[role].append(pk)
+        return by_role
+
+    def build_request(self, i, by_role, now, days):
+        requester_role = 'MANAGER' if random.random() < 0.15 else 'KARYAWAN'
+        created_at = now - datetime.timedelta(seconds=random.randint(0, days * 86400))
+        request_type = weighted(TYPE_WEIGHTS)
+        if requester_role == 'KARYAWAN' and request_type == 'PROPOSAL':
+            request_type = 'REIMBURSEMENT'
+
+        row = ServiceRequest(
+            employee_id=random.choice(by_role[requester_role]),
+            request_type=request_type,
+            title=f'{request_type.title()} request #{i}',
+            description='Synthetic request generated by seed_perf_data.',
+            director_approver_id=random.choice(by_role['DIREKTUR']),
+            created_at=created_at,
+        )
+        if request_type == 'REIMBURSEMENT':
+            row.amount = random.randint(50, 20000) * 1000
+        elif request_type == 'LEAVE':
+            row.start_date = (created_at + datetime.timedelta(days=random.randint(1, 30))).date()
+            row.end_date = row.start_date + datetime.timedelta(days=random.randint(0, 10))
+
+        # Older requests are more likely to have been processed
+        age_days = (now - created_at).days
+        decided = random.random() < min(0.97, 0.3 + age_days / 60)
+
+        if requester_role == 'MANAGER':
+            row.manager_status = 'NA'
+        else:
+            row.manager_approver_id = random.choice(by_role['MANAGER'])
+            row.manager_status = random.choices(['APPROVED', 'REJECTED'], [0.85, 0.15])[0] if decided else 'PENDING'
+
+        if row.manager_status == 'REJECTED':
+            row.status = 'REJECTED'
+        elif row.manager_status in ('APPROVED', 'NA') and (decided or random.random() < 0.5):
+            row.director_status = random.choices(['APPROVED', 'REJECTED'], [0.8, 0.2])[0] if decided else 'PENDING'
+            row.status = row.director_status
+
+        decided_after = datetime.timedelta(hours=random.randint(1, 240))
+        row.updated_at = min(now, created_at + decided_after) if row.status != 'PENDING' or row.manager_status != 'PENDING' else created_at
+        return row
+
+    def seed_requests(self, options, by_role):
+        total = options['requests']
+        batch_size = options['batch_size']
+        if not total:
+            return
+        if not (by_role['KARYAWAN'] and by_role['MANAGER'] and by_role['DIREKTUR']):
+            self.stderr.write('Need at least one KARYAWAN, MANAGER and DIREKTUR; increase --users.')
+            return
+
+        now = timezone.now()
+        with explicit_timestamps():
+            for offset in range(0, total, batch_size):
+                count = min(batch_size, total - offset)
+                ServiceRequest.objects.bulk_create(
+                    [self.build_request(offset + i, by_role, now, options['days']) for i in range(count)],
+                    batch_size=batch_size,
+                )
+                self.stdout.write(f'  requests: {offset + count}/{total}')
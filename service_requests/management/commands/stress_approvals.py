@@ -0,0 +1,84 @@
+import datetime
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+
+from employees.models import Employee
+from service_requests.approvals import APPROVED, REJECTED, decide
+from service_requests.models import ServiceRequest
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Race several threads deciding the same requests and report lost updates and throughput."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=200)
+
+    def handle(self, *args, **options):
+        tag = int(time.time())
+        today = datetime.date.today()
+        employees = {}
+        for role in ('KARYAWAN', 'MANAGER'):
+            user = User.objects.create(username=f'stress_{role.lower()}_{tag}')
+            employees[role] = Employee.objects.create(
+                user=user, role=role, position=role.title(), department='Stress', phone='0', date_hired=today
+            )
+        manager = employees['MANAGER']
+        ids = [
+            ServiceRequest.objects.create(
+                employee=employees['KARYAWAN'], request_type='LEAVE', title=f'Stress {i}',
+                description='Created by stress_approvals', manager_approver=manager,
+            ).pk
+            for i in range(options['requests'])
+        ]
+
+        wins = {pk: 0 for pk in ids}
+        counters = {'attempts': 0, 'retries': 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(options['threads'])
+
+        def worker(index):
+            action = 'approve' if index % 2 else 'reject'
+            barrier.wait()
+            try:
+                for pk in ids:
+                    snapshot = ServiceRequest.objects.get(pk=pk)
+                    while True:
+                        try:
+                            outcome = decide(manager, snapshot, action, f'thread {index}')
+                            break
+                        except OperationalError:
+                            with lock:
+                                counters['retries'] += 1
+                            time.sleep(0.001)
+                    with lock:
+                        counters['attempts'] += 1
+                        if outcome in (APPROVED, REJECTED):
+                            wins[pk] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        double_decided = sum(1 for n in wins.values() if n > 1)
+        undecided = sum(1 for n in wins.values() if n == 0)
+        self.stdout.write(f"{options['threads']} threads x {len(ids)} requests on {connection.vendor}")
+        self.stdout.write(f"attempts: {counters['attempts']}, lock retries: {counters['retries']}")
+        self.stdout.write(f"elapsed: {elapsed:.2f}s, throughput: {counters['attempts'] / elapsed:.1f} decisions/s")
+        if double_decided or undecided:
+            self.stdout.write(self.style.ERROR(f'{double_decided} decided twice, {undecided} never decided'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Every request decided exactly once.'))
+
+        ServiceRequest.objects.filter(pk__in=ids).delete()
+        User.objects.filter(pk__in=[e.user_id for e in employees.values()]).delete()
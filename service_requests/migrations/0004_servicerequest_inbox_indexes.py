@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0002_employee_role'),
+        ('service_requests', '0003_servicerequest_feedback'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['employee', 'created_at', 'id'], name='sr_employee_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['manager_approver', 'manager_status', 'created_at', 'id'], name='sr_manager_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['manager_approver', 'updated_at', 'id'], name='sr_manager_history_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['director_approver', 'director_status', 'manager_status', 'created_at', 'id'], name='sr_director_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['director_approver', 'updated_at', 'id'], name='sr_director_history_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:49
+
+import service_requests.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0004_servicerequest_inbox_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='servicerequest',
+            name='attachment',
+            field=models.FileField(blank=True, null=True, storage=service_requests.storage.attachment_storage, upload_to='requests/attachments/'),
+        ),
+    ]
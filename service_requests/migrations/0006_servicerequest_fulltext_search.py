@@ -0,0 +1,45 @@
+from django.db import migrations
+
+from service_requests.search import (
+    FTS_TABLE, FULLTEXT_INDEX, REQUEST_TABLE, SQLITE_TRIGGERS, install_sqlite_triggers,
+)
+
+# External content: the index stores only tokens, the text stays in REQUEST_TABLE
+SQLITE_CREATE = f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+    title, description,
+    content='{REQUEST_TABLE}', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+)"""
+
+MYSQL_FORWARD = f'ALTER TABLE `{REQUEST_TABLE}` ADD FULLTEXT INDEX `{FULLTEXT_INDEX}` (`title`, `description`)'
+MYSQL_REVERSE = f'ALTER TABLE `{REQUEST_TABLE}` DROP INDEX `{FULLTEXT_INDEX}`'
+
+
+def forward(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_CREATE, params=None)
+        install_sqlite_triggers(apps, schema_editor)
+    elif vendor == 'mysql':
+        schema_editor.execute(MYSQL_FORWARD, params=None)
+
+
+def reverse(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for name in SQLITE_TRIGGERS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}', params=None)
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}', params=None)
+    elif vendor == 'mysql':
+        schema_editor.execute(MYSQL_REVERSE, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_requests', '0005_attachment_content_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, reverse),
+    ]
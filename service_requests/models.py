@@ -1,5 +1,61 @@
 from django.db import models
+from django.db.models import Q
 from employees.models import Employee
+from service_requests.search import search_queryset
+from service_requests.storage import attachment_storage
+from service_requests.thumbnails import thumbnail_name
+
+
+def pending_approval_q(employee):
+    """
+    Q for requests waiting on `employee`'s decision.
+    """
+    if employee.role == 'MANAGER':
+        return Q(manager_approver=employee, manager_status='PENDING')
+    if employee.role == 'DIREKTUR':
+        # Director only sees requests the manager already cleared (or that have no manager step)
+        return Q(director_approver=employee, director_status='PENDING') & (
+            Q(manager_status='APPROVED') | Q(manager_status='NA') | Q(manager_approver__isnull=True)
+        )
+    return None
+
+
+def approval_history_q(employee):
+    """
+    Q for requests `employee` has already decided on.
+    """
+    if employee.role == 'MANAGER':
+        return Q(manager_approver=employee) & ~Q(manager_status='PENDING')
+    if employee.role == 'DIREKTUR':
+        return Q(director_approver=employee) & ~Q(director_status='PENDING')
+    return None
+
+
+class ServiceRequestQuerySet(models.QuerySet):
+    """
+    Approval inbox filters shared by the views, dashboard and benchmarks.
+    """
+
+    def pending_for(self, employee):
+        condition = pending_approval_q(employee)
+        return self.filter(condition) if condition is not None else self.none()
+
+    def history_for(self, employee):
+        condition = approval_history_q(employee)
+        return self.filter(condition) if condition is not None else self.none()
+
+    def involving(self, employee):
+        """
+        Requests `employee` submitted or is an approver on (who may see attachments).
+        """
+        return self.filter(Q(employee=employee) | Q(manager_approver=employee) | Q(director_approver=employee))
+
+    def search(self, text):
+        """
+        Full-text matches for `text`, best first (see service_requests.search).
+        """
+        return search_queryset(self, text).order_by('-search_rank', '-id')
+
 
 class ServiceRequest(models.Model):
     REQUEST_TYPES = (
@@ -19,7 +75,7 @@ class ServiceRequest(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='PENDING')
-    attachment = models.FileField(upload_to='requests/attachments/', blank=True, null=True)
+    attachment = models.FileField(upload_to='requests/attachments/', storage=attachment_storage, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -40,5 +96,24 @@ class ServiceRequest(models.Model):
     start_date = models.DateField(blank=True, null=True, help_text="Required for Leave")
     end_date = models.DateField(blank=True, null=True, help_text="Required for Leave")
 
+    objects = ServiceRequestQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # request_list_view / dashboard "My Requests"
+            models.Index(fields=['employee', 'created_at', 'id'], name='sr_employee_created_idx'),
+            # Manager inbox (pending, oldest first) and history (latest first)
+            models.Index(fields=['manager_approver', 'manager_status', 'created_at', 'id'], name='sr_manager_inbox_idx'),
+            models.Index(fields=['manager_approver', 'updated_at', 'id'], name='sr_manager_history_idx'),
+            # Director inbox also filters on manager_status
+            models.Index(fields=['director_approver', 'director_status', 'manager_status', 'created_at', 'id'], name='sr_director_inbox_idx'),
+            models.Index(fields=['director_approver', 'updated_at', 'id'], name='sr_director_history_idx'),
+        ]
+
     def __str__(self):
         return f"{self.get_request_type_display()}: {self.title} - {self.status}"
+
+    @property
+    def has_attachment_thumbnail(self):
+        # One stat() per row; thumbnails are rendered after commit, so may not exist yet
+        return bool(self.attachment) and self.attachment.storage.exists(thumbnail_name(self.attachment.name))
@@ -0,0 +1,136 @@
+"""
+Full-text search over ServiceRequest.title and description.
+
+One query API (ServiceRequestQuerySet.search) over two engines:
+
+- SQLite: an external-content FTS5 table, `service_requests_fts`, kept in
+  sync with the request table by triggers (migration 0006). Insert, delete
+  and updates of title/description go through triggers, including
+  queryset.update() and bulk_create(). Results are ranked with bm25(), with
+  title matches weighted above description matches.
+- MySQL: a FULLTEXT index on (title, description), which InnoDB maintains
+  itself. Results are ranked by MATCH ... AGAINST relevance.
+
+Terms are AND-ed prefix matches on both engines: "cuti sak" finds
+"Cuti sakit". Any other backend falls back to icontains, which is unindexed
+and fine only for small tables.
+
+SQLite caveat for future migrations: Django applies most AlterField /
+AddField / RemoveField operations on SQLite by rebuilding the table
+(create new, copy, drop old, rename), which silently drops the sync
+triggers and leaves the index stale. Any migration that alters
+ServiceRequest must end with
+
+    migrations.RunPython(search.install_sqlite_triggers, migrations.RunPython.noop)
+
+which re-creates the triggers and rebuilds the index. SearchTests checks
+that every trigger in SQLITE_TRIGGERS exists after all migrations ran.
+"""
+import re
+
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'service_requests_fts'
+FULLTEXT_INDEX = 'sr_fulltext_idx'
+# bm25() column weights: title, description
+FTS_WEIGHTS = (10.0, 1.0)
+MAX_TERMS = 8
+
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+REQUEST_TABLE = 'service_requests_servicerequest'
+
+# name -> body; external content, so the FTS table must be told about
+# every row change (a 'delete' command needs the old values)
+SQLITE_TRIGGERS = {
+    f'{FTS_TABLE}_ai': f"""AFTER INSERT ON {REQUEST_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f'{FTS_TABLE}_ad': f"""AFTER DELETE ON {REQUEST_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    # Approvals only touch status columns and never reach the index
+    f'{FTS_TABLE}_au': f"""AFTER UPDATE OF title, description ON {REQUEST_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+}
+
+
+def install_sqlite_triggers(apps, schema_editor):
+    """
+    (Re-)create the sync triggers and rebuild the index from the request
+    table. Safe to run repeatedly; a no-op on other databases. Usable
+    directly as a RunPython operation.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name, body in SQLITE_TRIGGERS.items():
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}', params=None)
+        schema_editor.execute(f'CREATE TRIGGER {name} {body}', params=None)
+    schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')", params=None)
+
+
+def missing_sqlite_triggers(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [REQUEST_TABLE])
+        existing = {row[0] for row in cursor.fetchall()}
+    return sorted(set(SQLITE_TRIGGERS) - existing)
+
+
+def search_terms(text):
+    """
+    Words of a user's query, with all query syntax (quotes, operators,
+    column filters) stripped so it can never break or widen the match.
+    """
+    return TOKEN.findall(text or '')[:MAX_TERMS]
+
+
+def fts5_query(terms):
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def mysql_boolean_query(terms):
+    return ' '.join(f'+{term}*' for term in terms)
+
+
+def search_queryset(queryset, text):
+    """
+    Filter `queryset` to requests matching `text` and annotate `search_rank`
+    (higher is better). An empty query matches nothing.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+
+    table = REQUEST_TABLE
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        # Join the FTS table once and drive the query from it. A MATCH per
+        # row goes quadratic for terms that hit most of the table; that is
+        # what a correlated rank subquery does, and what the planner picks
+        # when it can probe the FTS table by rowid from the request table
+        # (e.g. scoped to one employee). The unary + hides the rowid from
+        # the FTS index so the MATCH always runs exactly once.
+        # bm25() is negative, lower is better.
+        return queryset.extra(
+            select={'search_rank': f'-bm25({FTS_TABLE}, {weights})'},
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE} MATCH %s', f'+{FTS_TABLE}.rowid = "{table}"."id"'],
+            params=[fts5_query(terms)],
+        )
+
+    if vendor == 'mysql':
+        query = mysql_boolean_query(terms)
+        match = f'MATCH (`{table}`.`title`, `{table}`.`description`) AGAINST (%s IN BOOLEAN MODE)'
+        matches = RawSQL(f'SELECT `id` FROM `{table}` WHERE {match}', [query])
+        rank = RawSQL(match, [query], output_field=FloatField())
+        return queryset.filter(id__in=matches).annotate(search_rank=rank)
+
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(description__icontains=term)
+    return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
@@ -0,0 +1,152 @@
+"""
+Hand protected files to the front-end server, or serve them from Python
+with HTTP Range and conditional request support.
+
+ATTACHMENT_SENDFILE_BACKEND picks how the bytes leave:
+
+    'nginx'   X-Accel-Redirect to ATTACHMENT_ACCEL_PREFIX + name; nginx needs
+              an `internal` location aliasing MEDIA_ROOT, e.g.
+                  location /protected-media/ { internal; alias /srv/ez/media/; }
+    'apache'  X-Sendfile with the absolute path (mod_xsendfile, lighttpd)
+    'python'  FileResponse / ranged streaming from this process (default,
+              meant for development and small deployments)
+
+With the first two the worker returns immediately and the web server does
+the transfer, including Range and If-None-Match handling.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from service_requests.storage import is_content_addressed
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def sendfile_backend():
+    return getattr(settings, 'ATTACHMENT_SENDFILE_BACKEND', 'python')
+
+
+def file_etag(name, stat):
+    # Content-addressed names already are the content hash
+    if is_content_addressed(name):
+        return quote_etag(posixpath.splitext(posixpath.basename(name))[0])
+    return quote_etag(f'{int(stat.st_mtime):x}-{stat.st_size:x}')
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single satisfiable byte range, None to send
+    the whole file (no/invalid/multi-range header), or False if unsatisfiable.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        # Not a valid range spec (RFC 9110 14.1.1): ignore the header
+        return None
+    if start >= size:
+        return False
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def iter_range(fh, start, length):
+    try:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        fh.close()
+
+
+def range_applies(request, etag, last_modified):
+    """
+    If-Range: only honour Range while the client's copy is still current.
+    """
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    since = parse_http_date_safe(if_range)
+    return since is not None and int(last_modified) <= since
+
+
+def set_common_headers(response, name, download_name, etag, last_modified):
+    content_type, encoding = mimetypes.guess_type(download_name)
+    response['Content-Type'] = content_type or 'application/octet-stream'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Content-Disposition'] = f"inline; filename*=UTF-8''{quote(download_name)}"
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Hashed blobs never change, but access can be revoked: browser cache only, briefly
+    response['Cache-Control'] = 'private, max-age=3600' if is_content_addressed(name) else 'private, no-cache'
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def serve_protected(request, storage, name, download_name):
+    """
+    Response for `name` in `storage`; the caller has already checked access.
+    """
+    path = storage.path(name)
+    stat = os.stat(path)
+    etag = file_etag(name, stat)
+    last_modified = int(stat.st_mtime)
+
+    backend = sendfile_backend()
+    if backend == 'nginx':
+        prefix = getattr(settings, 'ATTACHMENT_ACCEL_PREFIX', '/protected-media/')
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(name)
+        set_common_headers(response, name, download_name, etag, last_modified)
+        del response['Accept-Ranges']
+        return response
+    if backend == 'apache':
+        response = HttpResponse()
+        response['X-Sendfile'] = path
+        set_common_headers(response, name, download_name, etag, last_modified)
+        del response['Accept-Ranges']
+        return response
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return set_common_headers(not_modified, name, download_name, etag, last_modified)
+
+    size = stat.st_size
+    byte_range = parse_range(request.headers.get('Range'), size) if range_applies(request, etag, last_modified) else None
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        # FileResponse lets the WSGI server use os.sendfile via wsgi.file_wrapper
+        response = FileResponse(open(path, 'rb'))
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(iter_range(open(path, 'rb'), start, end - start + 1), status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    return set_common_headers(response, name, download_name, etag, last_modified)
@@ -0,0 +1,76 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from employees.models import Employee
+from ez_request.api import SparseFieldsetsMixin
+from service_requests.models import ServiceRequest
+
+
+class EmployeeSummarySerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source='user.username', read_only=True)
+    full_name = serializers.CharField(source='user.get_full_name', read_only=True)
+
+    class Meta:
+        model = Employee
+        fields = ['id', 'username', 'full_name', 'position', 'role']
+
+
+class ServiceRequestSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    employee = EmployeeSummarySerializer(read_only=True)
+    manager_approver = serializers.PrimaryKeyRelatedField(
+        queryset=Employee.objects.filter(role='MANAGER'), required=False, allow_null=True
+    )
+    director_approver = serializers.PrimaryKeyRelatedField(queryset=Employee.objects.filter(role='DIREKTUR'))
+    # Permission-checked download URL rather than the raw MEDIA_URL path
+    attachment = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ServiceRequest
+        fields = [
+            'id', 'employee', 'request_type', 'title', 'description', 'status',
+            'manager_approver', 'manager_status', 'director_approver', 'director_status', 'feedback',
+            'amount', 'start_date', 'end_date', 'attachment', 'created_at', 'updated_at',
+        ]
+        read_only_fields = [
+            'status', 'manager_status', 'director_status', 'feedback', 'attachment', 'created_at', 'updated_at',
+        ]
+
+    def get_attachment(self, obj):
+        if not obj.attachment:
+            return None
+        url = reverse('service_requests:attachment', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def validate(self, attrs):
+        # Same rules as ServiceRequestForm
+        employee = self.context['request'].user.employee
+        request_type = attrs.get('request_type')
+
+        if employee.role == 'KARYAWAN':
+            if request_type == 'PROPOSAL':
+                raise serializers.ValidationError({'request_type': 'Employees cannot submit proposals.'})
+            if not attrs.get('manager_approver'):
+                raise serializers.ValidationError({'manager_approver': 'This field is required.'})
+        elif employee.role == 'MANAGER':
+            attrs['manager_approver'] = None
+
+        if request_type == 'REIMBURSEMENT' and not attrs.get('amount'):
+            raise serializers.ValidationError({'amount': 'Amount is required for Reimbursement requests.'})
+        if request_type == 'LEAVE':
+            start_date, end_date = attrs.get('start_date'), attrs.get('end_date')
+            errors = {}
+            if not start_date:
+                errors['start_date'] = 'Start date is required for Leave requests.'
+            if not end_date:
+                errors['end_date'] = 'End date is required for Leave requests.'
+            if not errors and end_date < start_date:
+                errors['end_date'] = 'End date cannot be before start date.'
+            if errors:
+                raise serializers.ValidationError(errors)
+        return attrs
+
+
+class DecisionSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=['approve', 'reject'])
+    feedback = serializers.CharField(required=False, allow_blank=True, default='')
@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from service_requests.counters import invalidate_dashboard_counts
+from service_requests.models import ServiceRequest
+from service_requests.storage import release_attachment
+from service_requests.thumbnails import schedule_thumbnail
+
+
+@receiver(post_save, sender=ServiceRequest)
+@receiver(post_delete, sender=ServiceRequest)
+def invalidate_counts(sender, instance, **kwargs):
+    invalidate_dashboard_counts(instance.employee_id, instance.manager_approver_id, instance.director_approver_id)
+
+
+@receiver(post_delete, sender=ServiceRequest)
+def release_deleted_attachment(sender, instance, using, **kwargs):
+    if instance.attachment:
+        release_attachment(instance.attachment.name, using=using)
+
+
+@receiver(post_save, sender=ServiceRequest)
+def queue_attachment_thumbnail(sender, instance, created, update_fields, using, **kwargs):
+    if not instance.attachment:
+        return
+    if created or update_fields is None or 'attachment' in update_fields:
+        schedule_thumbnail(instance.attachment.storage, instance.attachment.name, using=using)
@@ -0,0 +1,127 @@
+"""
+Content-addressed storage for ServiceRequest attachments.
+
+Uploads are stored as `<upload_to>/<aa>/<sha256><ext>`, where `aa` is the
+first two hex digits of the hash. An identical file uploaded again resolves
+to the same name and is not written twice. The hash is computed chunk by
+chunk while the upload is copied to a temporary file next to its
+destination, so a large file is never held in memory.
+
+References are counted from the ServiceRequest rows that point at a name, so
+the count cannot drift from the data: a blob is deleted only when the last
+row using it goes away (see release_attachment), and `dedup_attachments
+--prune` sweeps up blobs that were still inside the grace period then.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+import time
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+
+from service_requests.thumbnails import thumbnail_name
+
+# A blob written or reused this recently is never released: the row that
+# references it may not be committed yet
+RELEASE_GRACE_SECONDS = 60 * 60
+
+HASH_NAME = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{64}(\.[a-z0-9]{1,10})?$')
+MAX_EXTENSION_LENGTH = 10
+
+
+def content_name(directory, digest, original_name):
+    ext = posixpath.splitext(original_name)[1].lower()
+    if len(ext) > MAX_EXTENSION_LENGTH + 1 or not re.fullmatch(r'\.[a-z0-9]+', ext or '.'):
+        ext = ''
+    return posixpath.join(directory, digest[:2], f'{digest}{ext}')
+
+
+def is_content_addressed(name):
+    return bool(name and HASH_NAME.search(name))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content hash in _save(); never add suffixes
+        return name
+
+    def _save(self, name, content):
+        directory = posixpath.dirname(name)
+        folder = self.path(directory) if directory else self.location
+        os.makedirs(folder, exist_ok=True)
+
+        staged_path = getattr(content, 'staged_path', None)
+        if staged_path and os.path.dirname(staged_path) == folder:
+            # Already streamed and hashed into this folder by AttachmentUploadHandler
+            return self._commit(staged_path, content_name(directory, content.digest, name))
+
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    tmp.write(chunk)
+            return self._commit(tmp_path, content_name(directory, digest.hexdigest(), name))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _commit(self, tmp_path, final_name):
+        """
+        Move a fully written temp file to its hashed name, or drop it if that
+        content is already stored.
+        """
+        if self.exists(final_name):
+            # Refresh mtime so release_attachment() leaves a blob being reused alone
+            os.utime(self.path(final_name))
+            os.remove(tmp_path)
+            return final_name
+
+        final_path = self.path(final_name)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        # Same filesystem, so this is an atomic rename; a concurrent upload
+        # of the same content just replaces identical bytes.
+        file_move_safe(tmp_path, final_path, allow_overwrite=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(final_path, self.file_permissions_mode)
+        return final_name
+
+    def hash_file(self, name):
+        """
+        sha256 of a stored file, read in chunks.
+        """
+        digest = hashlib.sha256()
+        with self.open(name, 'rb') as fh:
+            for chunk in fh.chunks():
+                digest.update(chunk)
+        return digest.hexdigest()
+
+
+def attachment_storage():
+    return ContentAddressedStorage()
+
+
+def release_attachment(name, using=None):
+    """
+    Delete a content-addressed blob once no ServiceRequest references it.
+    Runs after commit so a rolled-back delete keeps its file.
+    """
+    if not is_content_addressed(name):
+        return
+
+    def _release():
+        from service_requests.models import ServiceRequest
+        storage = attachment_storage()
+        if not storage.exists(name) or ServiceRequest.objects.filter(attachment=name).exists():
+            return
+        if time.time() - os.path.getmtime(storage.path(name)) < RELEASE_GRACE_SECONDS:
+            return
+        storage.delete(name)
+        storage.delete(thumbnail_name(name))
+
+    transaction.on_commit(_release, using=using)
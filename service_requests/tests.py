@@ -1,3 +1,668 @@
-from django.test import TestCase
+import csv
+import datetime
+import json
+import os
+import tempfile
+import threading
+import time
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from employees.api import EmployeeViewSet
+from employees.directory import get_approver_choices
+from employees.models import Employee
+from ez_request.db.routers import use_primary
+from service_requests import approvals, search
+from service_requests.approvals import APPROVED, REJECTED, bulk_decide, decide
+from service_requests.counters import CACHE_KEY, get_dashboard_counts
+from service_requests.models import ServiceRequest
+from service_requests.storage import is_content_addressed
+from users.models import User
+
+
+def make_employee(username, role):
+    user = User.objects.create(username=username, first_name=username.title())
+    return Employee.objects.create(
+        user=user, role=role, position=role.title(), department='Ops', phone='0', date_hired=datetime.date.today()
+    )
+
+
+class QueryBudgetTests(TestCase):
+    """
+    List views must not issue per-row queries: the query count for a page
+    is fixed, whether it shows one row or a full page.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.manager = make_employee('manager', 'MANAGER')
+        self.director = make_employee('director', 'DIREKTUR')
+        self.staff = [make_employee(f'staff{i}', 'KARYAWAN') for i in range(10)]
+
+    def add_requests(self, count, **kwargs):
+        for i in range(count):
+            ServiceRequest.objects.create(
+                employee=self.staff[i % len(self.staff)],
+                request_type='LEAVE',
+                title=f'Request {i}',
+                description='Leave request',
+                manager_approver=self.manager,
+                director_approver=self.director,
+                **kwargs,
+            )
+
+    def assertFixedQueries(self, user, url, budget, grow):
+        """
+        Render `url` as `user` with one row, then with `grow()` adding rows,
+        asserting the same query budget both times.
+        """
+        self.client.force_login(user)
+        with self.assertNumQueries(budget):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        grow()
+        cache.clear()
+        with self.assertNumQueries(budget):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_manager_approval_list(self):
+        self.add_requests(1)
+        self.add_requests(1, manager_status='APPROVED')
+        self.assertFixedQueries(
+            self.manager.user, reverse('service_requests:approvals'), 5,
+            lambda: (self.add_requests(15), self.add_requests(15, manager_status='APPROVED')),
+        )
+
+    def test_director_approval_list(self):
+        self.add_requests(1, manager_status='APPROVED')
+        self.add_requests(1, manager_status='APPROVED', director_status='APPROVED', status='APPROVED')
+        self.assertFixedQueries(
+            self.director.user, reverse('service_requests:approvals'), 5,
+            lambda: (
+                self.add_requests(15, manager_status='APPROVED'),
+                self.add_requests(15, manager_status='APPROVED', director_status='APPROVED', status='APPROVED'),
+            ),
+        )
+
+    def test_request_list(self):
+        staff = self.staff[0]
+        self.add_requests(1)
+        self.assertFixedQueries(
+            staff.user, reverse('service_requests:list'), 4,
+            lambda: self.add_requests(len(self.staff) * 3),
+        )
+
+    def test_manager_dashboard(self):
+        self.add_requests(1)
+        self.assertFixedQueries(
+            self.manager.user, reverse('users:dashboard'), 6,
+            lambda: self.add_requests(10),
+        )
+
+    def test_director_dashboard(self):
+        self.add_requests(1, manager_status='APPROVED')
+        self.assertFixedQueries(
+            self.director.user, reverse('users:dashboard'), 5,
+            lambda: self.add_requests(10, manager_status='APPROVED'),
+        )
+
+
+class ApproverDirectoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = make_employee('staff', 'KARYAWAN')
+        for i in range(10):
+            make_employee(f'manager{i}', 'MANAGER')
+            make_employee(f'director{i}', 'DIREKTUR')
+
+    def test_create_form_query_count_does_not_grow_with_approvers(self):
+        self.client.force_login(self.staff.user)
+        url = reverse('service_requests:create')
+        self.client.get(url)  # warm the approver directory
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertContains(response, 'manager9 (Manager) - Manager')
+        self.assertContains(response, 'director9 (Direktur) - Direktur')
+
+    def test_directory_is_invalidated_on_employee_change(self):
+        self.client.force_login(self.staff.user)
+        url = reverse('service_requests:create')
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_employee('newmanager', 'MANAGER')
+            # Not dropped before the commit, or a concurrent form could re-cache the old list
+            self.assertNotContains(self.client.get(url), 'newmanager (Manager)')
+        self.assertContains(self.client.get(url), 'newmanager (Manager)')
+
+    @override_settings(DATABASE_REPLICAS=['lagging_replica'])
+    def test_cached_directory_is_read_from_primary(self):
+        # The alias does not exist, so any read routed to a replica would
+        # fail; outside the test's transaction reads would go there
+        view = EmployeeViewSet()
+        view.request = mock.Mock(query_params={})
+        with mock.patch.object(connection, 'in_atomic_block', False):
+            self.assertEqual(view.get_queryset().db, 'default')
+            choices = dict(get_approver_choices('MANAGER'))
+        self.assertIn('manager9 (Manager) - Manager', choices.values())
+
+    def test_autocomplete_endpoint(self):
+        self.client.force_login(self.staff.user)
+        response = self.client.get(reverse('employees:approvers'), {'role': 'MANAGER', 'q': 'manager1'})
+        self.assertEqual(response.json()['results'][0]['text'], 'manager1 (Manager) - Manager')
+
+
+class BulkApprovalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = make_employee('staff', 'KARYAWAN')
+        self.manager = make_employee('manager', 'MANAGER')
+        self.director = make_employee('director', 'DIREKTUR')
+
+    def create_request(self, **kwargs):
+        return ServiceRequest.objects.create(
+            employee=self.staff, request_type='LEAVE', title='Leave', description='Leave',
+            manager_approver=self.manager, director_approver=self.director, **kwargs,
+        )
+
+    def post_bulk(self, user, ids, action, feedback=''):
+        self.client.force_login(user)
+        return self.client.post(
+            reverse('service_requests:bulk_approve'),
+            {'ids': [str(pk) for pk in ids], 'action': action, 'feedback': feedback},
+            HTTP_ACCEPT='application/json',
+        ).json()['results']
+
+    def test_manager_bulk_approve_reports_per_id_outcomes(self):
+        pending = [self.create_request() for _ in range(3)]
+        done = self.create_request(manager_status='REJECTED', status='REJECTED')
+        other = ServiceRequest.objects.create(employee=self.staff, request_type='LEAVE', title='x', description='x')
+
+        results = self.post_bulk(self.manager.user, [r.pk for r in pending] + [done.pk, other.pk, 999999], 'approve', 'ok')
+
+        for r in pending:
+            self.assertEqual(results[str(r.pk)], 'approved')
+            r.refresh_from_db()
+            self.assertEqual((r.manager_status, r.status, r.feedback), ('APPROVED', 'PENDING', 'Manager: ok'))
+        self.assertEqual(results[str(done.pk)], 'already_processed')
+        self.assertEqual(results[str(other.pk)], 'not_approver')
+        self.assertEqual(results['999999'], 'not_found')
+
+    def test_director_bulk_reject_appends_feedback(self):
+        ready = self.create_request(manager_status='APPROVED', feedback='Manager: fine')
+        waiting = self.create_request()
+
+        results = self.post_bulk(self.director.user, [ready.pk, waiting.pk], 'reject', 'no budget')
+
+        ready.refresh_from_db()
+        self.assertEqual(results[str(ready.pk)], 'rejected')
+        self.assertEqual((ready.director_status, ready.status), ('REJECTED', 'REJECTED'))
+        self.assertEqual(ready.feedback, 'Manager: fine\nDirector: no budget')
+        self.assertEqual(results[str(waiting.pk)], 'waiting_for_manager')
+
+    def test_lost_race_is_reported_as_already_processed(self):
+        requests = [self.create_request() for _ in range(3)]
+        raced = requests[1]
+        real_classify = approvals.classify
+
+        def classify_then_race(row, employee):
+            # Another session decides this row after our SELECT, before our UPDATE
+            if row['id'] == raced.pk:
+                ServiceRequest.objects.filter(pk=raced.pk).update(manager_status='REJECTED', status='REJECTED')
+            return real_classify(row, employee)
+
+        with mock.patch('service_requests.approvals.classify', classify_then_race):
+            results = bulk_decide(self.manager, [r.pk for r in requests], 'approve')
+
+        self.assertEqual(results, {requests[0].pk: APPROVED, raced.pk: 'already_processed', requests[2].pk: APPROVED})
+        raced.refresh_from_db()
+        self.assertEqual(raced.manager_status, 'REJECTED')
+
+    def test_query_count_does_not_grow_with_selection(self):
+        ids = [self.create_request().pk for _ in range(50)]
+        self.client.force_login(self.manager.user)
+        # session, user, employee, then savepoint + SELECT ... FOR UPDATE + one UPDATE + release
+        with self.assertNumQueries(7):
+            self.client.post(reverse('service_requests:bulk_approve'), {'ids': ids, 'action': 'approve'})
+        self.assertEqual(ServiceRequest.objects.filter(manager_status='APPROVED').count(), 50)
+
+
+class DashboardCountInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = make_employee('staff', 'KARYAWAN')
+        self.manager = make_employee('manager', 'MANAGER')
+        self.director = make_employee('director', 'DIREKTUR')
+        self.people = [self.staff, self.manager, self.director]
+
+    def create_request(self):
+        return ServiceRequest.objects.create(
+            employee=self.staff, request_type='LEAVE', title='Leave', description='Leave',
+            manager_approver=self.manager, director_approver=self.director,
+        )
+
+    def cached(self):
+        return [cache.get(CACHE_KEY.format(employee_id=employee.pk)) is not None for employee in self.people]
+
+    def assertInvalidatedOnCommit(self, change):
+        for employee in self.people:
+            get_dashboard_counts(employee)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            change()
+            # Still cached until the transaction commits
+            self.assertEqual(self.cached(), [True, True, True])
+        self.assertTrue(callbacks)
+        self.assertEqual(self.cached(), [False, False, False])
+
+    def test_save_and_delete(self):
+        self.assertInvalidatedOnCommit(self.create_request)
+        service_request = ServiceRequest.objects.get()
+        self.assertEqual(get_dashboard_counts(self.manager)['pending_approvals_count'], 1)
+        self.assertInvalidatedOnCommit(service_request.delete)
+        self.assertEqual(get_dashboard_counts(self.staff)['total_requests_count'], 0)
+
+    def test_bulk_decide(self):
+        service_request = self.create_request()
+        self.assertInvalidatedOnCommit(lambda: bulk_decide(self.manager, [service_request.pk], 'approve'))
+        self.assertEqual(get_dashboard_counts(self.manager)['pending_approvals_count'], 0)
+        self.assertEqual(get_dashboard_counts(self.director)['pending_approvals_count'], 1)
+
+
+class ConcurrentApprovalTests(TransactionTestCase):
+    """
+    Threads race to decide the same requests. Every request must be decided
+    exactly once, and its final state must match the single winning call.
+    """
+    THREADS = 8
+    REQUESTS = 20
+    # Replicas (DB_REPLICAS) mirror the test database
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.staff = make_employee('staff', 'KARYAWAN')
+        self.manager = make_employee('manager', 'MANAGER')
+        self.director = make_employee('director', 'DIREKTUR')
+        self.requests = [
+            ServiceRequest.objects.create(
+                employee=self.staff, request_type='LEAVE', title=f'Leave {i}', description='Leave',
+                manager_approver=self.manager, director_approver=self.director,
+            )
+            for i in range(self.REQUESTS)
+        ]
+
+    def hammer(self, approver):
+        wins = {r.pk: [] for r in self.requests}
+        lock = threading.Lock()
+        barrier = threading.Barrier(self.THREADS)
+
+        def worker(index):
+            action = 'approve' if index % 2 else 'reject'
+            barrier.wait()
+            # Like the approve POST (see ReplicaStickinessMiddleware), read from the primary
+            with use_primary():
+                try:
+                    for service_request in self.requests:
+                        snapshot = ServiceRequest.objects.get(pk=service_request.pk)
+                        while True:
+                            try:
+                                outcome = decide(approver, snapshot, action, f'thread {index}')
+                                break
+                            except OperationalError:
+                                # SQLite allows one writer at a time; a real client would retry too
+                                time.sleep(0.001)
+                        if outcome in (APPROVED, REJECTED):
+                            with lock:
+                                wins[service_request.pk].append((index, outcome))
+                finally:
+                    connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return wins
+
+    def test_manager_step_is_decided_exactly_once(self):
+        wins = self.hammer(self.manager)
+
+        for service_request in self.requests:
+            self.assertEqual(len(wins[service_request.pk]), 1, wins[service_request.pk])
+            index, outcome = wins[service_request.pk][0]
+            service_request.refresh_from_db()
+            self.assertEqual(service_request.manager_status, outcome.upper())
+            self.assertEqual(service_request.feedback, f'Manager: thread {index}')
+            self.assertEqual(service_request.status, 'REJECTED' if outcome == REJECTED else 'PENDING')
+
+    def test_director_step_is_decided_exactly_once(self):
+        ServiceRequest.objects.update(manager_status='APPROVED', feedback='Manager: ok')
+        wins = self.hammer(self.director)
+
+        for service_request in self.requests:
+            self.assertEqual(len(wins[service_request.pk]), 1, wins[service_request.pk])
+            index, outcome = wins[service_request.pk][0]
+            service_request.refresh_from_db()
+            self.assertEqual(service_request.director_status, outcome.upper())
+            self.assertEqual(service_request.status, outcome.upper())
+            self.assertEqual(service_request.feedback, f'Manager: ok\nDirector: thread {index}')
+
+
+class ServiceRequestApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = make_employee('staff', 'KARYAWAN')
+        self.manager = make_employee('manager', 'MANAGER')
+        self.director = make_employee('director', 'DIREKTUR')
+        for i in range(3):
+            ServiceRequest.objects.create(
+                employee=self.staff, request_type='LEAVE', title=f'Leave {i}', description='Leave',
+                manager_approver=self.manager, director_approver=self.director,
+            )
+
+    def test_sparse_fieldsets(self):
+        self.client.force_login(self.staff.user)
+        results = self.client.get('/api/v1/requests/', {'fields': 'id,title'}).json()['results']
+        self.assertEqual(set(results[0]), {'id', 'title'})
+
+    def test_conditional_get_returns_304_until_data_changes(self):
+        self.client.force_login(self.manager.user)
+        first = self.client.get('/api/v1/approvals/')
+        self.assertEqual(first.status_code, 200)
+
+        # Unchanged inbox: one aggregate query after auth, no serialization
+        with self.assertNumQueries(4):
+            cached = self.client.get('/api/v1/approvals/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+        pk = first.json()['results'][0]['id']
+        self.client.post(f'/api/v1/approvals/{pk}/decide/', {'action': 'approve'}, content_type='application/json')
+        self.assertEqual(self.client.get('/api/v1/approvals/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = make_employee('staff', 'KARYAWAN')
+        self.manager = make_employee('manager', 'MANAGER')
+        self.admin = make_employee('admin', 'ADMIN')
+        self.leave = ServiceRequest.objects.create(
+            employee=self.staff, request_type='LEAVE', title='=HYPERLINK("http://evil")', description='x',
+            manager_approver=self.manager,
+        )
+        self.claim = ServiceRequest.objects.create(
+            employee=self.staff, request_type='REIMBURSEMENT', title='Taxi', description='x',
+            amount='-12.50', status='APPROVED',
+        )
+
+    def test_csv_escapes_formulas(self):
+        self.client.force_login(self.admin.user)
+        response = self.client.get(reverse('service_requests:export'))
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['id'] for row in rows], [str(self.leave.pk), str(self.claim.pk)])
+        self.assertEqual(rows[0]['title'], '\'=HYPERLINK("http://evil")')
+        self.assertEqual((rows[0]['manager_approver'], rows[0]['director_approver']), ('manager', ''))
+        # Only text is escaped; a negative amount stays a number
+        self.assertEqual(rows[1]['amount'], '-12.50')
+
+    def test_ndjson_is_filtered_and_unescaped(self):
+        self.client.force_login(self.admin.user)
+        response = self.client.get(reverse('service_requests:export'), {'format': 'ndjson', 'status': 'PENDING'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['title'], '=HYPERLINK("http://evil")')
+        self.assertIsNone(records[0]['amount'])
+        self.assertEqual(records[0]['employee'], 'staff')
+
+    def test_export_is_admin_only(self):
+        for employee in (self.staff, self.manager):
+            self.client.force_login(employee.user)
+            response = self.client.get(reverse('service_requests:export'))
+            self.assertRedirects(response, reverse('users:dashboard'), fetch_redirect_response=False)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('service_requests:export')).status_code, 302)
+
+    def test_command_writes_filtered_export(self):
+        stdout = StringIO()
+        call_command('export_requests', '--type', 'REIMBURSEMENT', stdout=stdout)
+        rows = list(csv.DictReader(StringIO(stdout.getvalue())))
+        self.assertEqual([row['title'] for row in rows], ['Taxi'])
+
+        with tempfile.NamedTemporaryFile(suffix='.ndjson', delete=False) as fh:
+            self.addCleanup(os.remove, fh.name)
+        call_command('export_requests', '--format', 'ndjson', '--output', fh.name)
+        with open(fh.name) as fh:
+            self.assertEqual(len(fh.readlines()), 2)
+
+
+class AttachmentStorageTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        override = override_settings(MEDIA_ROOT=self.media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.employee = make_employee('uploader', 'KARYAWAN')
+
+    def make_request(self, **kwargs):
+        return ServiceRequest.objects.create(
+            employee=self.employee, request_type='LEAVE', title='Cuti', description='-', **kwargs
+        )
+
+    def test_identical_uploads_are_stored_once(self):
+        first = self.make_request(attachment=SimpleUploadedFile('Bukti.JPEG', b'same bytes'))
+        second = self.make_request(attachment=SimpleUploadedFile('Bukti (1).jpeg', b'same bytes'))
+        self.assertEqual(first.attachment.name, second.attachment.name)
+        self.assertTrue(is_content_addressed(first.attachment.name))
+        self.assertTrue(first.attachment.name.endswith('.jpeg'))
+
+        folder = os.path.dirname(os.path.join(self.media.name, first.attachment.name))
+        self.assertEqual(os.listdir(folder), [os.path.basename(first.attachment.name)])
+
+    def test_dedup_command_merges_legacy_copies(self):
+        legacy_dir = os.path.join(self.media.name, 'requests', 'attachments')
+        os.makedirs(legacy_dir)
+        for suffix in ('', '_AbC1234'):
+            with open(os.path.join(legacy_dir, f'scan{suffix}.png'), 'wb') as fh:
+                fh.write(b'png bytes')
+            self.make_request(attachment=f'requests/attachments/scan{suffix}.png')
+
+        call_command('dedup_attachments', stdout=StringIO())
+
+        names = set(ServiceRequest.objects.values_list('attachment', flat=True))
+        self.assertEqual(len(names), 1)
+        name = names.pop()
+        self.assertTrue(is_content_addressed(name))
+        with open(os.path.join(self.media.name, name), 'rb') as fh:
+            self.assertEqual(fh.read(), b'png bytes')
+        self.assertEqual(sorted(os.listdir(legacy_dir)), [os.path.dirname(name).rsplit('/', 1)[1]])
+
+    def submit(self, upload):
+        cache.clear()
+        manager = make_employee('boss', 'MANAGER')
+        director = make_employee('bigboss', 'DIREKTUR')
+        self.client.force_login(self.employee.user)
+        return self.client.post(reverse('service_requests:create'), {
+            'request_type': 'LEAVE', 'title': 'Cuti', 'description': 'Libur',
+            'start_date': '2026-01-01', 'end_date': '2026-01-02',
+            'manager_approver': manager.pk, 'director_approver': director.pk,
+            'attachment': upload,
+        })
+
+    def stored_files(self):
+        return [name for _, _, files in os.walk(self.media.name) for name in files]
+
+    def test_upload_is_streamed_into_place(self):
+        response = self.submit(SimpleUploadedFile('scan.pdf', b'%PDF-1.4 ' + b'x' * 200_000))
+        self.assertRedirects(response, reverse('service_requests:list'), fetch_redirect_response=False)
+        name = ServiceRequest.objects.get().attachment.name
+        self.assertTrue(is_content_addressed(name) and name.endswith('.pdf'))
+        self.assertEqual(self.stored_files(), [os.path.basename(name)])
+
+    def test_type_is_sniffed_from_content(self):
+        response = self.submit(SimpleUploadedFile('invoice.pdf', b'MZ\x90\x00 not really a pdf' * 10))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Unsupported file type', response.context['form'].errors['attachment'][0])
+        self.assertFalse(ServiceRequest.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+    def test_upload_too_short_to_sniff(self):
+        response = self.submit(SimpleUploadedFile('note.txt', b'hello'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Unsupported file type', response.context['form'].errors['attachment'][0])
+        self.assertFalse(ServiceRequest.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+    def test_empty_upload(self):
+        response = self.submit(SimpleUploadedFile('empty.pdf', b''))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('empty', response.context['form'].errors['attachment'][0])
+        self.assertFalse(ServiceRequest.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+    @override_settings(ATTACHMENT_MAX_SIZES={'application/pdf': 100_000, 'image/png': 10_000_000})
+    def test_per_type_size_cap(self):
+        response = self.submit(SimpleUploadedFile('big.pdf', b'%PDF-1.4 ' + b'x' * 300_000))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('too large', response.context['form'].errors['attachment'][0])
+        self.assertFalse(ServiceRequest.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+    def test_download_is_permission_checked(self):
+        service_request = self.make_request(attachment=SimpleUploadedFile('scan.pdf', b'%PDF-1.4 0123456789'))
+        url = reverse('service_requests:attachment', args=[service_request.pk])
+
+        self.client.force_login(make_employee('stranger', 'MANAGER').user)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.force_login(self.employee.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4 0123456789')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+
+        partial = self.client.get(url, HTTP_RANGE='bytes=9-12')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial['Content-Range'], 'bytes 9-12/19')
+        self.assertEqual(b''.join(partial.streaming_content), b'0123')
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=-3').getvalue(), b'789')
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=50-').status_code, 416)
+        # last < first is not a valid range: the header is ignored, not refused
+        invalid = self.client.get(url, HTTP_RANGE='bytes=5-3')
+        self.assertEqual(invalid.status_code, 200)
+        self.assertEqual(b''.join(invalid.streaming_content), b'%PDF-1.4 0123456789')
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=12-50').getvalue(), b'3456789')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        with self.settings(ATTACHMENT_SENDFILE_BACKEND='nginx'):
+            offloaded = self.client.get(url)
+        self.assertEqual(offloaded['X-Accel-Redirect'], f'/protected-media/{service_request.attachment.name}')
+        self.assertEqual(offloaded.content, b'')
+
+    @override_settings(ATTACHMENT_THUMBNAIL_WORKERS=0, ATTACHMENT_THUMBNAIL_SIZE=(64, 64))
+    def test_thumbnail_is_rendered_after_commit(self):
+        from PIL import Image
+        buffer = BytesIO()
+        Image.new('RGB', (400, 200), 'red').save(buffer, 'PNG')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            service_request = self.make_request(attachment=SimpleUploadedFile('foto.png', buffer.getvalue()))
+        self.assertTrue(service_request.has_attachment_thumbnail)
+        url = reverse('service_requests:attachment_thumbnail', args=[service_request.pk])
+
+        self.client.force_login(make_employee('stranger', 'MANAGER').user)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.force_login(self.employee.user)
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        with Image.open(BytesIO(b''.join(response.streaming_content))) as thumbnail:
+            self.assertEqual(thumbnail.size, (64, 32))
+        self.assertContains(self.client.get(reverse('service_requests:list')), url)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = make_employee('staff', 'KARYAWAN')
+        self.manager = make_employee('manager', 'MANAGER')
+
+    def make_request(self, title, description, **kwargs):
+        return ServiceRequest.objects.create(
+            employee=self.staff, request_type='LEAVE', title=title, description=description,
+            manager_approver=self.manager, **kwargs
+        )
+
+    def titles(self, queryset):
+        return [r.title for r in queryset]
+
+    def test_index_follows_saves_and_deletes(self):
+        taxi = self.make_request('Taxi receipt', 'Airport trip')
+        self.make_request('Annual leave', 'Family trip to Bali')
+        self.assertCountEqual(self.titles(ServiceRequest.objects.search('trip')), ['Annual leave', 'Taxi receipt'])
+
+        taxi.title = 'Hotel invoice'
+        taxi.save()
+        self.assertEqual(self.titles(ServiceRequest.objects.search('taxi')), [])
+        self.assertEqual(self.titles(ServiceRequest.objects.search('hot inv')), ['Hotel invoice'])
+
+        taxi.delete()
+        self.assertEqual(self.titles(ServiceRequest.objects.search('hotel')), [])
+
+    def test_title_matches_rank_first_and_syntax_is_ignored(self):
+        self.make_request('Laptop charger', 'Replacement for my laptop')
+        self.make_request('Seminar fee', 'Bring the laptop')
+        self.assertEqual(self.titles(ServiceRequest.objects.search('laptop')), ['Laptop charger', 'Seminar fee'])
+        self.assertEqual(self.titles(ServiceRequest.objects.search('laptop" (* -:')), ['Laptop charger', 'Seminar fee'])
+        self.assertEqual(self.titles(ServiceRequest.objects.search('  ')), [])
+
+    def test_lists_are_searchable(self):
+        self.make_request('Taxi receipt', 'Airport trip')
+        self.make_request('Annual leave', 'Family trip to Bali', manager_status='APPROVED')
+
+        self.client.force_login(self.staff.user)
+        response = self.client.get(reverse('service_requests:list'), {'q': 'taxi'})
+        self.assertEqual(self.titles(response.context['requests']), ['Taxi receipt'])
+
+        self.client.force_login(self.manager.user)
+        response = self.client.get(reverse('service_requests:approvals'), {'q': 'bali'})
+        self.assertEqual(self.titles(response.context['approval_list']), [])
+        self.assertEqual(self.titles(response.context['history_list']), ['Annual leave'])
+
+    def test_common_terms_run_one_match(self):
+        # A term in most rows must not run a MATCH per row: the FTS table
+        # drives the query, including a count scoped to one employee, and
+        # the request table is probed by id
+        ServiceRequest.objects.bulk_create(
+            ServiceRequest(
+                employee=self.staff, request_type='LEAVE', title=f'Leave request {i}',
+                description='Please approve this request', manager_approver=self.manager,
+            )
+            for i in range(150)
+        )
+        self.make_request('Taxi receipt', 'Airport trip')
+        queryset = ServiceRequest.objects.filter(employee=self.staff).search('request')
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(queryset.count(), 150)
+            self.assertEqual(len(queryset[:10]), 10)
+        if connection.vendor != 'sqlite':
+            return
+        for query in ctx.captured_queries:
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                plan = [row[-1] for row in cursor.fetchall()]
+            self.assertTrue(plan[0].startswith(f'SCAN {search.FTS_TABLE}'), plan)
+
+    def test_sqlite_triggers_survive_migrations(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        # Table rebuilds by later migrations drop triggers; see search.py
+        self.assertEqual(search.missing_sqlite_triggers(connection), [])
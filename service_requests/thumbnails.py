@@ -0,0 +1,141 @@
+"""
+Thumbnails and first-page previews for request attachments.
+
+After a request with an attachment is committed, the rendering is queued on a
+small thread pool (Pillow and pdftoppm do their work outside the GIL) and the
+result is written next to the original as `<name>.thumb.webp`. Because
+attachments are content-addressed, identical uploads share one thumbnail, and
+an existing thumbnail is never rendered twice.
+
+Images are rendered with Pillow. PDFs get a first-page preview when poppler's
+`pdftoppm` is on PATH. Anything else, or a missing optional tool, just has no
+thumbnail and the templates fall back to a paperclip link.
+"""
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SUFFIX = '.thumb.webp'
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+PDF_EXTENSIONS = ('.pdf',)
+PDFTOPPM_TIMEOUT = 30
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def thumbnail_name(name):
+    return f'{name}{THUMBNAIL_SUFFIX}'
+
+
+def thumbnail_size():
+    return tuple(getattr(settings, 'ATTACHMENT_THUMBNAIL_SIZE', (320, 320)))
+
+
+def can_render(name):
+    if Image is None:
+        return False
+    ext = os.path.splitext(name)[1].lower()
+    return ext in IMAGE_EXTENSIONS or (ext in PDF_EXTENSIONS and shutil.which('pdftoppm') is not None)
+
+
+def _open_pdf_first_page(path, size):
+    # pdftoppm scales while rasterising, so the full page is never held at print resolution
+    with tempfile.TemporaryDirectory() as tmp:
+        prefix = os.path.join(tmp, 'page')
+        subprocess.run(
+            ['pdftoppm', '-f', '1', '-l', '1', '-singlefile', '-png', '-scale-to', str(max(size)), path, prefix],
+            check=True, timeout=PDFTOPPM_TIMEOUT, capture_output=True,
+        )
+        with Image.open(prefix + '.png') as page:
+            page.load()
+            return page
+
+
+def render_thumbnail(source_path, dest_path, size=None):
+    """
+    Write a WebP thumbnail of `source_path` to `dest_path` (atomically).
+    """
+    size = size or thumbnail_size()
+    if source_path.lower().endswith(PDF_EXTENSIONS):
+        image = _open_pdf_first_page(source_path, size)
+    else:
+        with Image.open(source_path) as source:
+            # JPEG: let the decoder downscale by 1/2..1/8 instead of decoding every pixel
+            source.draft('RGB', size)
+            image = ImageOps.exif_transpose(source)
+            image.load()
+
+    image.thumbnail(size, Image.Resampling.LANCZOS)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest_path), suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            image.save(fh, 'WEBP', quality=75, method=4)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def generate_thumbnail(storage, name):
+    """
+    Render the thumbnail for one stored attachment unless it already exists.
+    Returns the thumbnail name, or None if none could be made.
+    """
+    target = thumbnail_name(name)
+    if storage.exists(target):
+        return target
+    if not can_render(name) or not storage.exists(name):
+        return None
+    try:
+        render_thumbnail(storage.path(name), storage.path(target))
+    except Exception:
+        # A corrupt or exotic file only loses its thumbnail
+        logger.warning('Could not render thumbnail for %s', name, exc_info=True)
+        return None
+    return target
+
+
+def executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'ATTACHMENT_THUMBNAIL_WORKERS', 2),
+                thread_name_prefix='thumbnails',
+            )
+    return _executor
+
+
+def schedule_thumbnail(storage, name, using=None):
+    """
+    Queue thumbnail rendering once the surrounding transaction commits.
+    ATTACHMENT_THUMBNAIL_WORKERS = 0 renders inline instead.
+    """
+    if not name or not can_render(name):
+        return
+
+    def _submit():
+        if getattr(settings, 'ATTACHMENT_THUMBNAIL_WORKERS', 2) <= 0:
+            generate_thumbnail(storage, name)
+        else:
+            executor().submit(generate_thumbnail, storage, name)
+
+    transaction.on_commit(_submit, using=using)
@@ -0,0 +1,196 @@
+"""
+Upload handler for ServiceRequest attachments.
+
+The default handlers keep up to 2.5 MB per file in memory, spool anything
+bigger to /tmp, and ContentAddressedStorage then copies it into MEDIA_ROOT.
+AttachmentUploadHandler instead writes the `attachment` field in fixed-size
+chunks straight to a staging file inside the attachment folder, hashing as it
+goes. Saving the model then only has to rename that file (see
+ContentAddressedStorage._save). Per-upload memory stays at one chunk no matter
+how large or how many uploads run at once.
+
+The real type is sniffed from the first bytes, not from the client's
+Content-Type or the extension. Each type has its own size cap, and an upload
+that goes over it is aborted as soon as the cap is crossed, or up front when
+the request's Content-Length already says it will be.
+"""
+import hashlib
+import os
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopFutureHandlers, StopUpload
+from django.template.defaultfilters import filesizeformat
+
+FIELD_NAME = 'attachment'
+SNIFF_BYTES = 16
+
+MB = 1024 * 1024
+DEFAULT_MAX_SIZES = {
+    'application/pdf': 10 * MB,
+    'image/jpeg': 5 * MB,
+    'image/png': 5 * MB,
+    'image/gif': 2 * MB,
+    'image/webp': 5 * MB,
+    'application/vnd.openxmlformats': 10 * MB,  # .docx / .xlsx / .pptx
+}
+
+OFFICE_EXTENSIONS = ('.docx', '.xlsx', '.pptx')
+
+
+def max_sizes():
+    return getattr(settings, 'ATTACHMENT_MAX_SIZES', DEFAULT_MAX_SIZES)
+
+
+def sniff_content_type(head, file_name=''):
+    """
+    Content type from magic bytes, or None if it isn't an accepted kind.
+    """
+    if head.startswith(b'%PDF-'):
+        return 'application/pdf'
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    # OOXML documents are zip archives; only trust that with a matching extension
+    if head.startswith(b'PK\x03\x04') and file_name.lower().endswith(OFFICE_EXTENSIONS):
+        return 'application/vnd.openxmlformats'
+    return None
+
+
+def upload_error(request):
+    return getattr(request, 'attachment_upload_error', None)
+
+
+class StagedAttachment(UploadedFile):
+    """
+    An attachment already written (and hashed) next to its final location.
+    ContentAddressedStorage renames it into place instead of copying; if it
+    is never saved, closing it removes the staging file.
+    """
+
+    def __init__(self, staged_path, name, content_type, size, digest):
+        super().__init__(open(staged_path, 'rb'), name, content_type, size)
+        self.staged_path = staged_path
+        self.digest = digest
+
+    def temporary_file_path(self):
+        return self.staged_path
+
+    def close(self):
+        try:
+            return self.file.close()
+        finally:
+            if os.path.exists(self.staged_path):
+                os.remove(self.staged_path)
+
+
+class RejectedAttachment(UploadedFile):
+    """
+    Stands in for an attachment that was refused only once it was complete
+    (empty, or too short to sniff). The form reports the recorded
+    upload_error instead of saving it.
+    """
+
+    def __init__(self, head, name, size):
+        super().__init__(BytesIO(head), name, None, size)
+
+
+class AttachmentUploadHandler(FileUploadHandler):
+    chunk_size = 64 * 1024
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.chunk_size = getattr(settings, 'ATTACHMENT_UPLOAD_CHUNK_SIZE', self.chunk_size)
+        self.request_length = None
+        self.active = False
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.request_length = content_length
+
+    def fail(self, message, abort=True):
+        self.request.attachment_upload_error = message
+        self.discard()
+        # connection_reset: stop reading the body instead of draining it
+        raise StopUpload(connection_reset=True) if abort else SkipFile()
+
+    def discard(self):
+        self.active = False
+        # MultiPartParser._close_files() closes `handler.file`, so only keep it while writing
+        staging = self.__dict__.pop('file', None)
+        if staging is not None:
+            staging.close()
+            if os.path.exists(self.staging_path):
+                os.remove(self.staging_path)
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.active = field_name == FIELD_NAME
+        if not self.active:
+            return
+
+        limit = max(max_sizes().values())
+        if self.request_length and self.request_length > limit + self.chunk_size:
+            self.fail(f'File is too large (max {filesizeformat(limit)}).')
+
+        from service_requests.models import ServiceRequest
+        field = ServiceRequest._meta.get_field(FIELD_NAME)
+        directory = field.storage.path(field.upload_to)
+        os.makedirs(directory, exist_ok=True)
+        fd, self.staging_path = tempfile.mkstemp(dir=directory, suffix='.part')
+        self.file = os.fdopen(fd, 'wb')
+        self.digest = hashlib.sha256()
+        self.head = b''
+        self.sniffed_type = None
+        self.size = 0
+        # The default handlers never see this file
+        raise StopFutureHandlers()
+
+    def sniff(self):
+        self.sniffed_type = sniff_content_type(self.head, self.file_name)
+        if self.sniffed_type is None:
+            self.fail('Unsupported file type. Upload a PDF, image (JPEG, PNG, GIF, WebP) or Office document.', abort=False)
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+
+        if self.sniffed_type is None:
+            self.head += raw_data[:SNIFF_BYTES - len(self.head)]
+            if len(self.head) >= SNIFF_BYTES:
+                self.sniff()
+
+        self.size += len(raw_data)
+        limit = max_sizes()[self.sniffed_type] if self.sniffed_type else max(max_sizes().values())
+        if self.size > limit:
+            self.fail(f'File is too large (max {filesizeformat(limit)} for this type).')
+
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+        if self.sniffed_type is None:
+            try:
+                self.sniff()
+            except SkipFile:
+                # Returning None would pass the file on to the default
+                # handlers, which never saw its new_file()
+                return RejectedAttachment(self.head, self.file_name, self.size)
+        self.__dict__.pop('file').close()
+        self.active = False
+        return StagedAttachment(self.staging_path, self.file_name, self.sniffed_type, self.size, self.digest.hexdigest())
+
+    def upload_interrupted(self):
+        self.discard()
+
+    def upload_complete(self):
+        self.discard()
@@ -1,5 +1,5 @@
 from django.urls import path
-from service_requests.views import request_list_view, request_create_view, request_delete_view, approval_list_view, request_approve_view
+from service_requests.views import request_list_view, request_create_view, request_delete_view, approval_list_view, request_approve_view, request_bulk_approve_view, request_export_view, request_attachment_view, request_attachment_thumbnail_view
 
 app_name = 'service_requests'
 
@@ -9,4 +9,8 @@ urlpatterns = [
     path('delete/<int:pk>/', request_delete_view, name='delete'),
     path('approvals/', approval_list_view, name='approvals'),
     path('approve/<int:pk>/', request_approve_view, name='approve'),
+    path('approve/bulk/', request_bulk_approve_view, name='bulk_approve'),
+    path('export/', request_export_view, name='export'),
+    path('<int:pk>/attachment/', request_attachment_view, name='attachment'),
+    path('<int:pk>/attachment/thumbnail/', request_attachment_thumbnail_view, name='attachment_thumbnail'),
 ]
@@ -1,9 +1,33 @@
+import os
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q
+from django.core.paginator import Paginator
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import require_POST
 from service_requests.models import ServiceRequest
-from service_requests.forms import ServiceRequestForm
+from service_requests.forms import ServiceRequestForm, RequestExportForm
+from service_requests.export import export_queryset, export_lines
+from service_requests.uploads import AttachmentUploadHandler, upload_error
+from service_requests.sendfile import serve_protected
+from service_requests.thumbnails import thumbnail_name
+from service_requests.approvals import (
+    decide, bulk_decide, APPROVED, REJECTED, ALREADY_PROCESSED, WAITING_FOR_MANAGER
+)
+from users.pagination import CursorPaginator
+
+SEARCH_PER_PAGE = 10
+
+
+def _paginate(queryset, query, page, ordering):
+    # Search results are ordered by rank, which no keyset cursor can encode,
+    # so they use numbered pages (COUNT over the matches only)
+    if query:
+        return Paginator(queryset.search(query), SEARCH_PER_PAGE).get_page(page)
+    return CursorPaginator(queryset, 10, ordering=ordering).get_page(page)
+
 
 @login_required
 def request_list_view(request):
@@ -12,18 +36,25 @@ def request_list_view(request):
         messages.error(request, "You must be an employee to view requests.")
         return redirect('users:dashboard')
         
-    requests = ServiceRequest.objects.filter(employee=request.user.employee).order_by('-created_at')
-    
-    # Pagination
-    from django.core.paginator import Paginator
-    paginator = Paginator(requests, 10) # Show 10 requests per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    return render(request, 'service_requests/list.html', {'requests': page_obj})
+    requests = ServiceRequest.objects.filter(employee=request.user.employee)
+    query = request.GET.get('q', '').strip()
+
+    # Keyset pagination (no COUNT/OFFSET, deep pages cost the same as page 1),
+    # or ranked full-text matches when searching
+    page_obj = _paginate(requests, query, request.GET.get('page'), ('-created_at', '-id'))
+
+    return render(request, 'service_requests/list.html', {'requests': page_obj, 'query': query})
 
+@csrf_exempt
 @login_required
 def request_create_view(request):
+    # The attachment handler has to be installed before anything reads
+    # request.POST, including the CSRF check, hence csrf_exempt + csrf_protect
+    request.upload_handlers.insert(0, AttachmentUploadHandler(request))
+    return _request_create_view(request)
+
+@csrf_protect
+def _request_create_view(request):
     if not hasattr(request.user, 'employee'):
         messages.error(request, "You must be an employee to submit requests.")
         return redirect('users:dashboard')
@@ -34,7 +65,7 @@ def request_create_view(request):
         return redirect('users:dashboard')
 
     if request.method == 'POST':
-        form = ServiceRequestForm(request.POST, request.FILES, user=request.user)
+        form = ServiceRequestForm(request.POST, request.FILES, user=request.user, upload_error=upload_error(request))
         if form.is_valid():
             service_request = form.save(commit=False)
             service_request.employee = request.user.employee
@@ -76,46 +107,22 @@ def approval_list_view(request):
     
     employee = request.user.employee
     
-    # 1. PENDING APPROVALS
-    if employee.role == 'MANAGER':
-        pending_list = ServiceRequest.objects.filter(
-            manager_approver=employee, 
-            manager_status='PENDING'
-        ).order_by('created_at')
-        
-        history_list = ServiceRequest.objects.filter(
-            manager_approver=employee
-        ).exclude(manager_status='PENDING').order_by('-updated_at')
-        
-    elif employee.role == 'DIREKTUR':
-        pending_list = ServiceRequest.objects.filter(
-            director_approver=employee, 
-            director_status='PENDING'
-        ).filter(
-            Q(manager_status='APPROVED') | Q(manager_status='NA') | Q(manager_approver__isnull=True)
-        ).order_by('created_at')
-        
-        history_list = ServiceRequest.objects.filter(
-            director_approver=employee
-        ).exclude(director_status='PENDING').order_by('-updated_at')
-    else:
-        pending_list = []
-        history_list = []
-
-    # Pagination for Pending Approvals
-    from django.core.paginator import Paginator
-    paginator_pending = Paginator(pending_list, 10)
-    page_pending = request.GET.get('page_pending')
-    pending_list_obj = paginator_pending.get_page(page_pending)
-    
-    # Pagination for History
-    paginator_history = Paginator(history_list, 10)
-    page_history = request.GET.get('page_history')
-    history_list_obj = paginator_history.get_page(page_history)
+    # 1. PENDING APPROVALS / 2. HISTORY (filters live on ServiceRequestQuerySet)
+    # select_related: the templates render requester name/position per row
+    pending_list = ServiceRequest.objects.pending_for(employee).select_related('employee__user')
+    history_list = ServiceRequest.objects.history_for(employee).select_related('employee__user')
+
+    query = request.GET.get('q', '').strip()
+
+    # Pending Approvals oldest first, History most recently processed first
+    # (both ranked by relevance when searching)
+    pending_list_obj = _paginate(pending_list, query, request.GET.get('page_pending'), ('created_at', 'id'))
+    history_list_obj = _paginate(history_list, query, request.GET.get('page_history'), ('-updated_at', '-id'))
 
     return render(request, 'service_requests/approval_list.html', {
         'approval_list': pending_list_obj,
-        'history_list': history_list_obj
+        'history_list': history_list_obj,
+        'query': query,
     })
 
 @login_required
@@ -127,42 +134,94 @@ def request_approve_view(request, pk):
     service_request = get_object_or_404(ServiceRequest, pk=pk)
     action = request.POST.get('action')
     feedback = request.POST.get('feedback', '')
-    status_val = 'APPROVED' if action == 'approve' else 'REJECTED'
-
-    # Use IDs for safer comparison
-    is_manager = service_request.manager_approver_id == employee.id
-    is_director = service_request.director_approver_id == employee.id
-
-    if is_manager and service_request.manager_status == 'PENDING':
-        service_request.manager_status = status_val
-        service_request.feedback = f"Manager: {feedback}" if feedback else None
-        if status_val == 'REJECTED':
-            service_request.status = 'REJECTED'
-        service_request.save()
-        messages.success(request, f"Request {status_val.lower()} successfully.")
-        
-    elif is_director and service_request.director_status == 'PENDING':
-        # Conditions: 
-        # 1. Manager Status is explicitly APPROVED
-        # 2. Manager Status is explicitly NA (Manager request)
-        # 3. Manager Approver is None (Implicit Not Applicable)
-        can_approve = False
-        if service_request.manager_status in ['APPROVED', 'NA']:
-            can_approve = True
-        elif service_request.manager_approver is None:
-            # If no manager assigned, implicit NA
-            can_approve = True
-            
-        if can_approve:
-            service_request.director_status = status_val
-            service_request.status = status_val # Final status matches Director
-            current_feedback = service_request.feedback + "\n" if service_request.feedback else ""
-            service_request.feedback = f"{current_feedback}Director: {feedback}" if feedback else service_request.feedback
-            service_request.save()
-            messages.success(request, f"Request {status_val.lower()} successfully.")
-        else:
-            messages.error(request, "Cannot process this request. Manager approval is pending.")
+
+    # Conditional UPDATE ... WHERE <step> = 'PENDING': safe against concurrent approvers and double clicks
+    outcome = decide(employee, service_request, action, feedback)
+
+    if outcome in (APPROVED, REJECTED):
+        messages.success(request, f"Request {outcome} successfully.")
+    elif outcome == WAITING_FOR_MANAGER:
+        messages.error(request, "Cannot process this request. Manager approval is pending.")
+    elif outcome == ALREADY_PROCESSED:
+        messages.error(request, "This request has already been processed.")
     else:
         messages.error(request, "Invalid approval action.")
     
     return redirect('service_requests:approvals')
+
+@login_required
+@require_POST
+def request_bulk_approve_view(request):
+    if not hasattr(request.user, 'employee'):
+        return redirect('users:dashboard')
+
+    action = request.POST.get('action')
+    if action not in ('approve', 'reject'):
+        messages.error(request, "Invalid approval action.")
+        return redirect('service_requests:approvals')
+
+    ids = [pk for pk in request.POST.getlist('ids') if pk.isdigit()]
+    outcomes = bulk_decide(request.user.employee, ids, action, request.POST.get('feedback', ''))
+
+    if 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse({'results': {str(pk): outcome for pk, outcome in outcomes.items()}})
+
+    processed = sum(1 for outcome in outcomes.values() if outcome in (APPROVED, REJECTED))
+    skipped = len(outcomes) - processed
+    if processed:
+        messages.success(request, f"{processed} request(s) {'approved' if action == 'approve' else 'rejected'} successfully.")
+    if skipped:
+        messages.warning(request, f"{skipped} request(s) could not be processed.")
+    if not outcomes:
+        messages.error(request, "No requests selected.")
+    return redirect('service_requests:approvals')
+
+@login_required
+def request_export_view(request):
+    if not hasattr(request.user, 'employee') or request.user.employee.role != 'ADMIN':
+        messages.error(request, "Access denied. Admins only.")
+        return redirect('users:dashboard')
+
+    form = RequestExportForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    # Streamed row by row: memory stays flat regardless of how many rows match
+    export_format = form.cleaned_data['format']
+    qs = export_queryset(**form.export_filters())
+    response = StreamingHttpResponse(
+        export_lines(qs, export_format),
+        content_type='text/csv' if export_format == 'csv' else 'application/x-ndjson',
+    )
+    response['Content-Disposition'] = f'attachment; filename="service_requests.{export_format}"'
+    return response
+
+def _involved_attachment(request, pk):
+    # Only the submitter and the request's approvers; everyone else gets a 404
+    if not hasattr(request.user, 'employee'):
+        raise Http404
+    service_request = get_object_or_404(
+        ServiceRequest.objects.involving(request.user.employee).only('id', 'attachment'), pk=pk
+    )
+    if not service_request.attachment:
+        raise Http404
+    return service_request, service_request.attachment
+
+
+@login_required
+def request_attachment_view(request, pk):
+    service_request, attachment = _involved_attachment(request, pk)
+    if not attachment.storage.exists(attachment.name):
+        raise Http404
+
+    ext = os.path.splitext(attachment.name)[1].lower()
+    return serve_protected(request, attachment.storage, attachment.name, f'attachment-{service_request.pk}{ext}')
+
+
+@login_required
+def request_attachment_thumbnail_view(request, pk):
+    service_request, attachment = _involved_attachment(request, pk)
+    name = thumbnail_name(attachment.name)
+    if not attachment.storage.exists(name):
+        raise Http404
+    return serve_protected(request, attachment.storage, name, f'attachment-{service_request.pk}.webp')
@@ -0,0 +1,107 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from users.management.commands.benchmark_templates import percentile
+
+# Runs in a fresh interpreter so nothing is already imported. Mirrors what
+# manage.py and wsgi.py do before the first request: import the settings,
+# then django.setup() (app registry, models, signals).
+SETUP_SCRIPT = """
+import json, os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {base_dir!r})
+os.environ['DJANGO_SETTINGS_MODULE'] = {settings_module!r}
+try:
+    import pymysql
+    pymysql.install_as_MySQLdb()
+except ImportError:
+    pass
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+settings_done = time.perf_counter()
+django.setup()
+done = time.perf_counter()
+print(json.dumps({{'settings_ms': (settings_done - start) * 1000, 'setup_ms': (done - settings_done) * 1000}}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold start: import the settings and run django.setup() in fresh "
+        "interpreters and report the timings as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=10, help='Fresh interpreters to start')
+        parser.add_argument(
+            '--settings-module', default=None,
+            help='Settings module to time (defaults to the one in use)',
+        )
+        parser.add_argument(
+            '--importtime', type=int, default=0, metavar='N',
+            help='Also list the N slowest imports of one extra run (python -X importtime)',
+        )
+        parser.add_argument('--output', default=None, help='Write JSON here instead of stdout')
+
+    def handle(self, *args, **options):
+        script = SETUP_SCRIPT.format(
+            base_dir=str(settings.BASE_DIR),
+            settings_module=options['settings_module'] or os.environ['DJANGO_SETTINGS_MODULE'],
+        )
+        samples = {'settings_ms': [], 'setup_ms': [], 'process_ms': []}
+        for _ in range(options['runs']):
+            start = time.perf_counter()
+            result = self.run(script)
+            samples['process_ms'].append((time.perf_counter() - start) * 1000)
+            timings = json.loads(result.stdout.strip().splitlines()[-1])
+            samples['settings_ms'].append(timings['settings_ms'])
+            samples['setup_ms'].append(timings['setup_ms'])
+
+        report = {'runs': options['runs']}
+        for key, values in samples.items():
+            values.sort()
+            report[key] = {
+                'mean': round(statistics.mean(values), 1),
+                'p50': round(percentile(values, 50), 1),
+                'max': round(values[-1], 1),
+            }
+        if options['importtime']:
+            report['slowest_imports'] = self.slowest_imports(script, options['importtime'])
+
+        payload = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(payload)
+            self.stdout.write(self.style.SUCCESS(f"Wrote startup timings to {options['output']}"))
+        else:
+            self.stdout.write(payload)
+
+    def run(self, script, *flags):
+        result = subprocess.run(
+            [sys.executable, *flags, '-c', script], capture_output=True, text=True, cwd=settings.BASE_DIR,
+        )
+        if result.returncode:
+            raise CommandError(f'Startup failed:\n{result.stderr}')
+        return result
+
+    def slowest_imports(self, script, limit):
+        # -X importtime lines: "import time: self [us] | cumulative | imported package"
+        rows = []
+        for line in self.run(script, '-X', 'importtime').stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            self_us, cumulative_us, module = line[len('import time:'):].split('|', 2)
+            rows.append((int(cumulative_us), int(self_us), module.strip()))
+        rows.sort(reverse=True)
+        return [
+            {'module': module, 'cumulative_ms': round(cumulative / 1000, 1), 'self_ms': round(own / 1000, 1)}
+            for cumulative, own, module in rows[:limit]
+        ]
@@ -0,0 +1,124 @@
+import copy
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import AnonymousUser
+
+from employees.models import Employee
+from users.models import User
+
+ROLES = ['ANONYMOUS', 'KARYAWAN', 'MANAGER', 'DIREKTUR', 'ADMIN']
+
+PLAIN_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+# name -> (template loaders, navbar fragment cache timeout)
+PROFILES = {
+    'before': (PLAIN_LOADERS, 0),
+    'after': ([('django.template.loaders.cached.Loader', PLAIN_LOADERS)], None),
+}
+
+DASHBOARD_CONTEXT = {
+    'employee_count': 0,
+    'recent_employees': [],
+    'recent_requests': [],
+    'recent_approvals': [],
+    'pending_approvals_count': 0,
+    'total_history_count': 0,
+    'total_requests_count': 0,
+}
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def bench_user(role):
+    """
+    Unsaved user (and employee) so the benchmark measures templates, not the database.
+    """
+    if role == 'ANONYMOUS':
+        return AnonymousUser()
+    user = User(id=1, username=f'bench_{role.lower()}')
+    Employee(user=user, role=role, position='Bench', department='Bench')
+    return user
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the dashboard (or the welcome page for anonymous users) per role, "
+        "before (uncached loaders, no navbar fragment cache) and after, and report "
+        "per-render template time as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help='Renders per role and profile')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed renders per role and profile')
+        parser.add_argument('--roles', nargs='*', default=ROLES, choices=ROLES)
+        parser.add_argument('--output', default=None, help='Write JSON here instead of stdout')
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        results = []
+        for profile, (loaders, navbar_timeout) in PROFILES.items():
+            templates = copy.deepcopy(settings.TEMPLATES)
+            templates[0]['APP_DIRS'] = False
+            templates[0]['OPTIONS']['loaders'] = loaders
+            overrides = {'TEMPLATES': templates}
+            if navbar_timeout is not None:
+                overrides['NAVBAR_CACHE_TIMEOUT'] = navbar_timeout
+
+            # Fresh engine (and empty fragment cache) for every profile
+            with override_settings(**overrides):
+                cache.clear()
+                for role in options['roles']:
+                    request = factory.get('/')
+                    request.user = bench_user(role)
+                    name = 'users/welcome.html' if role == 'ANONYMOUS' else 'users/dashboard.html'
+                    results.append(self.measure(profile, role, name, request, options))
+
+        by_key = {(row['profile'], row['role']): row for row in results}
+        for role in options['roles']:
+            before, after = by_key.get(('before', role)), by_key.get(('after', role))
+            if before and after and after['mean_ms']:
+                after['speedup'] = round(before['mean_ms'] / after['mean_ms'], 2)
+
+        payload = json.dumps({'iterations': options['iterations'], 'results': results}, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(payload)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} results to {options['output']}"))
+        else:
+            self.stdout.write(payload)
+
+    def measure(self, profile, role, name, request, options):
+        for _ in range(options['warmup']):
+            render_to_string(name, DASHBOARD_CONTEXT, request=request)
+
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(options['iterations']):
+                start = time.perf_counter()
+                render_to_string(name, DASHBOARD_CONTEXT, request=request)
+                timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return {
+            'profile': profile,
+            'role': role,
+            'template': name,
+            'mean_ms': round(statistics.mean(timings), 3),
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'queries_per_render': round(len(queries) / options['iterations'], 2),
+        }
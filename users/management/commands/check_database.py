@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Connect to the configured database(s), run a trivial query and report "
+        "the latency. Exits non-zero when a database is unreachable, so it can "
+        "serve as a readiness probe."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', action='append', dest='databases', default=None,
+            help='Alias to check (repeatable); defaults to every configured database',
+        )
+
+    def handle(self, *args, **options):
+        aliases = options['databases'] or list(connections)
+        failed = []
+        for alias in aliases:
+            if alias not in connections:
+                raise CommandError(f'Unknown database alias: {alias}')
+            connection = connections[alias]
+            start = time.perf_counter()
+            try:
+                connection.ensure_connection()
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+            except DatabaseError as exc:
+                failed.append(alias)
+                self.stderr.write(f'{alias}: {connection.vendor} unreachable ({exc})')
+                continue
+            finally:
+                connection.close()
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stdout.write(f"{alias}: {connection.vendor} {connection.settings_dict['NAME']} OK in {elapsed:.1f} ms")
+
+        if failed:
+            raise CommandError(f"Unreachable: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS('All databases reachable'))
@@ -0,0 +1,49 @@
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+# Keys the check_request simulation used to keep in the DB session
+LEGACY_KEYS = ('sim_queue', 'sim_stage', 'sim_identity', 'allowed_categories')
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions and strip legacy check_request simulation data "
+        "from django_session; anonymous sessions left empty are removed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would change')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        # 1. Expired rows (same as clearsessions)
+        expired = Session.objects.filter(expire_date__lt=timezone.now())
+        expired_count = expired.count() if dry_run else expired.delete()[0]
+
+        # 2. Live rows still carrying simulation keys
+        emptied, stripped = [], 0
+        store = Session.get_session_store_class()()
+        for session in Session.objects.iterator(chunk_size=options['chunk_size']):
+            data = session.get_decoded()
+            if not any(key in data for key in LEGACY_KEYS):
+                continue
+            for key in LEGACY_KEYS:
+                data.pop(key, None)
+            if not data:
+                emptied.append(session.pk)
+                continue
+            stripped += 1
+            if not dry_run:
+                Session.objects.filter(pk=session.pk).update(session_data=store.encode(data))
+
+        if emptied and not dry_run:
+            for i in range(0, len(emptied), options['chunk_size']):
+                Session.objects.filter(pk__in=emptied[i:i + options['chunk_size']]).delete()
+
+        prefix = '[dry run] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Expired: {expired_count}, emptied: {len(emptied)}, stripped: {stripped}"
+        ))
@@ -0,0 +1,140 @@
+import base64
+import json
+
+from django.db.models import Q
+
+
+class CursorPage:
+    """
+    One page of results from a CursorPaginator.
+    Exposes the same has_next/has_previous interface as Django's Page so the
+    shared pagination template can render either kind.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Keyset paginator: pages are selected with a WHERE on the ordering columns
+    instead of OFFSET, and no COUNT(*) is issued. Page N costs the same as page 1.
+
+    `ordering` must end with a unique column (normally 'id' / '-id') so that
+    rows sharing the same timestamp are still split deterministically.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [o.lstrip('-') for o in self.ordering]
+
+    # --- Cursor encoding -------------------------------------------------
+
+    def encode_cursor(self, obj, direction):
+        values = []
+        for name in self.fields:
+            field = self.queryset.model._meta.get_field(name)
+            values.append(field.value_to_string(obj))
+        payload = json.dumps({'d': direction, 'v': values}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, token):
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            direction = payload['d']
+            raw_values = payload['v']
+            if direction not in ('n', 'p') or len(raw_values) != len(self.fields):
+                return None
+            values = [
+                self.queryset.model._meta.get_field(name).to_python(raw)
+                for name, raw in zip(self.fields, raw_values)
+            ]
+        except Exception:
+            # Tampered or stale token: fall back to the first page
+            return None
+        return direction, values
+
+    # --- Query building --------------------------------------------------
+
+    def _keyset_filter(self, values, reverse):
+        """
+        Build (a > x) OR (a = x AND b > y) ... for the ordering columns,
+        flipping the comparison for descending columns or reversed direction.
+        """
+        condition = Q()
+        equal_prefix = Q()
+        for ordering, name, value in zip(self.ordering, self.fields, values):
+            descending = ordering.startswith('-')
+            if reverse:
+                descending = not descending
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal_prefix & Q(**{f'{name}__{lookup}': value})
+            equal_prefix &= Q(**{name: value})
+        return condition
+
+    def _reversed_ordering(self):
+        return [o[1:] if o.startswith('-') else f'-{o}' for o in self.ordering]
+
+    def get_page(self, token=None):
+        decoded = self.decode_cursor(token) if token else None
+
+        if decoded is None:
+            rows = list(self.queryset.order_by(*self.ordering)[:self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            return CursorPage(
+                rows,
+                self,
+                next_cursor=self.encode_cursor(rows[-1], 'n') if has_more else None,
+            )
+
+        direction, values = decoded
+        if direction == 'n':
+            qs = self.queryset.filter(self._keyset_filter(values, reverse=False)).order_by(*self.ordering)
+            rows = list(qs[:self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            return CursorPage(
+                rows,
+                self,
+                next_cursor=self.encode_cursor(rows[-1], 'n') if has_more else None,
+                previous_cursor=self.encode_cursor(rows[0], 'p') if rows else None,
+            )
+
+        # Walking backwards: read in reverse order, then flip for display
+        qs = self.queryset.filter(self._keyset_filter(values, reverse=True)).order_by(*self._reversed_ordering())
+        rows = list(qs[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return CursorPage(
+            rows,
+            self,
+            next_cursor=self.encode_cursor(rows[-1], 'n') if rows else None,
+            previous_cursor=self.encode_cursor(rows[0], 'p') if has_more else None,
+        )
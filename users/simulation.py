@@ -0,0 +1,254 @@
+"""
+State store for the public check_request simulation.
+
+Visitors only get a small signed cookie holding a random simulation id; the
+state itself lives in the cache with a TTL, so demo traffic never touches
+django_session. Nothing is written until the state actually changes.
+
+Layout per simulation:
+    sim:<id>            stage, identity, allowed_categories, `order`
+                        (queued request ids, oldest first) and `expires`
+                        (when each request's key expires)
+    sim:<id>:req:<rid>  one queued request
+
+The queue is capped at SIMULATION_QUEUE_MAX entries with the oldest evicted,
+and updating a request rewrites only that request's key. Request keys live
+for ENTRY_TTL_FACTOR times the index's TTL, so they outlive the index across
+many writes; only keys about to be outlived are refreshed, in one batch.
+"""
+import time
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+COOKIE_NAME = 'ez_sim'
+COOKIE_SALT = 'users.simulation'
+DEFAULT_STAGE = 'identity'
+ENTRY_TTL_FACTOR = 2
+
+# Caps on visitor-supplied text so one entry can't bloat the store
+MAX_FIELD_LENGTHS = {
+    'name': 100,
+    'role': 20,
+    'title': 200,
+    'description': 1000,
+    'manager_comment': 500,
+    'amount': 20,
+}
+
+
+def state_ttl():
+    return getattr(settings, 'SIMULATION_STATE_TTL', 60 * 60 * 2)
+
+
+def queue_max():
+    return getattr(settings, 'SIMULATION_QUEUE_MAX', 50)
+
+
+def clip(data):
+    """
+    Truncate known free-text fields of a dict to their caps.
+    """
+    return {
+        key: value[:MAX_FIELD_LENGTHS[key]] if isinstance(value, str) and key in MAX_FIELD_LENGTHS else value
+        for key, value in data.items()
+    }
+
+
+class SimulationState:
+    def __init__(self, sim_id=None, data=None):
+        self.sim_id = sim_id
+        data = data or {}
+        self._stage = data.get('stage', DEFAULT_STAGE)
+        self._identity = data.get('identity', {})
+        self._allowed_categories = data.get('allowed_categories', [])
+        # Insertion-ordered id index: dict gives O(1) membership and keeps age order
+        self._order = dict.fromkeys(data.get('order', []))
+        self._expires = {req_id: data.get('expires', {}).get(req_id, 0) for req_id in self._order}
+        self._entries = None  # Loaded lazily by `queue`
+        self._meta_dirty = False
+        self._dirty_entries = {}
+        self._evicted = []
+
+    # --- Loading / saving ------------------------------------------------
+
+    @classmethod
+    def load(cls, request):
+        token = request.COOKIES.get(COOKIE_NAME)
+        if not token:
+            return cls()
+        try:
+            sim_id = signing.loads(token, salt=COOKIE_SALT, max_age=state_ttl())
+        except signing.BadSignature:
+            return cls()
+        # Expired entries simply start over under the same id
+        return cls(sim_id, cache.get(cls.cache_key(sim_id)))
+
+    @staticmethod
+    def cache_key(sim_id):
+        return f'sim:{sim_id}'
+
+    @staticmethod
+    def entry_key(sim_id, req_id):
+        return f'sim:{sim_id}:req:{req_id}'
+
+    @property
+    def dirty(self):
+        return self._meta_dirty or bool(self._dirty_entries) or bool(self._evicted)
+
+    def serialize(self):
+        return {
+            'stage': self._stage,
+            'identity': self._identity,
+            'allowed_categories': self._allowed_categories,
+            'order': list(self._order),
+            'expires': {req_id: self._expires.get(req_id, 0) for req_id in self._order},
+        }
+
+    def save(self, response):
+        """
+        Persist only what changed, so visitors who only browse get neither a
+        cache entry nor a cookie. Each write extends the TTL of the whole
+        simulation, queued entries included.
+        """
+        if not self.dirty:
+            return
+        if self.sim_id is None:
+            self.sim_id = uuid.uuid4().hex
+        ttl = state_ttl()
+        entry_ttl = ttl * ENTRY_TTL_FACTOR
+        now = time.time()
+        meta_key = self.cache_key(self.sim_id)
+        if self._evicted:
+            cache.delete_many([self.entry_key(self.sim_id, req_id) for req_id in self._evicted])
+        # Entries must outlive the index listing them: rewrite the changed ones
+        # and, in the same batch, any the refreshed index would outlive
+        entries = {req_id: entry for req_id, entry in self._dirty_entries.items() if req_id in self._order}
+        expiring = [
+            req_id for req_id in self._order
+            if req_id not in entries and self._expires.get(req_id, 0) < now + ttl
+        ]
+        if expiring:
+            keys = {self.entry_key(self.sim_id, req_id): req_id for req_id in expiring}
+            entries.update((keys[key], entry) for key, entry in cache.get_many(list(keys)).items())
+        if entries:
+            cache.set_many({self.entry_key(self.sim_id, req_id): entry for req_id, entry in entries.items()}, entry_ttl)
+            self._expires.update(dict.fromkeys(entries, now + entry_ttl))
+            self._meta_dirty = True
+        if self._meta_dirty:
+            cache.set(meta_key, self.serialize(), ttl)
+        else:
+            cache.touch(meta_key, ttl)
+        self._meta_dirty, self._dirty_entries, self._evicted = False, {}, []
+        response.set_cookie(
+            COOKIE_NAME,
+            signing.dumps(self.sim_id, salt=COOKIE_SALT),
+            max_age=ttl,
+            httponly=True,
+            samesite='Lax',
+            secure=getattr(settings, 'SESSION_COOKIE_SECURE', False),
+        )
+
+    # --- State accessors -------------------------------------------------
+
+    def _set(self, attr, value):
+        if getattr(self, attr) != value:
+            setattr(self, attr, value)
+            self._meta_dirty = True
+
+    @property
+    def stage(self):
+        return self._stage
+
+    @stage.setter
+    def stage(self, value):
+        self._set('_stage', value)
+
+    @property
+    def identity(self):
+        return self._identity
+
+    @identity.setter
+    def identity(self, value):
+        self._set('_identity', clip(value))
+
+    @property
+    def allowed_categories(self):
+        return self._allowed_categories
+
+    @allowed_categories.setter
+    def allowed_categories(self, value):
+        self._set('_allowed_categories', list(value))
+
+    # --- Request queue ---------------------------------------------------
+
+    def __len__(self):
+        return len(self._order)
+
+    @property
+    def queue(self):
+        """
+        Queued requests, oldest first, fetched with a single get_many.
+        Entries whose keys already expired are dropped from the index.
+        """
+        if self._entries is None:
+            stored = [req_id for req_id in self._order if req_id not in self._dirty_entries]
+            self._entries = dict(self._dirty_entries)  # Unsaved edits win over what is stored
+            if stored and self.sim_id:
+                keys = {self.entry_key(self.sim_id, req_id): req_id for req_id in stored}
+                found = cache.get_many(list(keys))
+                self._entries.update((keys[key], entry) for key, entry in found.items())
+            if len(self._entries) != len(self._order):
+                self._order = dict.fromkeys(req_id for req_id in self._order if req_id in self._entries)
+                self._meta_dirty = True
+        return [self._entries[req_id] for req_id in self._order]
+
+    def get_request(self, req_id):
+        if req_id not in self._order:
+            return None
+        if self._entries is not None:
+            return self._entries.get(req_id)
+        if req_id in self._dirty_entries:
+            return self._dirty_entries[req_id]
+        return cache.get(self.entry_key(self.sim_id, req_id)) if self.sim_id else None
+
+    def add_request(self, entry):
+        entry = clip(entry)
+        req_id = entry['id']
+        self._order[req_id] = None
+        self._dirty_entries[req_id] = entry
+        if self._entries is not None:
+            self._entries[req_id] = entry
+        # Oldest-first eviction beyond the cap
+        while len(self._order) > queue_max():
+            oldest = next(iter(self._order))
+            del self._order[oldest]
+            self._dirty_entries.pop(oldest, None)
+            if self._entries is not None:
+                self._entries.pop(oldest, None)
+            self._evicted.append(oldest)
+        self._meta_dirty = True
+
+    def update_request(self, req_id, **changes):
+        """
+        Update one queued request in place; only its key is rewritten on save.
+        """
+        entry = self.get_request(req_id)
+        if entry is None:
+            return None
+        entry.update(clip(changes))
+        self._dirty_entries[req_id] = entry
+        return entry
+
+    def reset(self, keep_queue=False):
+        self.stage = DEFAULT_STAGE
+        self.identity = {}
+        self.allowed_categories = []
+        if not keep_queue and self._order:
+            self._evicted.extend(self._order)
+            self._order = {}
+            self._entries = {}
+            self._dirty_entries = {}
+            self._meta_dirty = True
@@ -0,0 +1,34 @@
+from django import template
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.forms.utils import flatatt
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+# Best compression first: browsers take the first <source> they support
+SOURCE_ORDER = ('avif', 'webp')
+
+
+@register.simple_tag
+def responsive_image(path, alt='', sizes='100vw', loading='lazy', **attrs):
+    """
+    <picture> with AVIF/WebP srcsets built by collectstatic (see
+    ez_request/staticfiles.py), falling back to the original file. Without a
+    build (e.g. runserver) this is a plain lazy-loaded <img>.
+
+    {% responsive_image 'images/team.jpeg' alt='Team' sizes='(min-width: 992px) 25vw, 100vw' class='card-img-top' %}
+    """
+    img = format_html('<img{}>', flatatt({
+        'src': static(path), 'alt': alt, 'loading': loading, 'decoding': 'async', **attrs,
+    }))
+    index = getattr(staticfiles_storage, 'responsive_index', None)
+    entry = index().get(path) if index else None
+    if not entry:
+        return img
+
+    sources = format_html_join('', '<source type="image/{}" srcset="{}" sizes="{}">', (
+        (fmt, ', '.join(f'{static(name)} {width}w' for name, width in entry['variants'][fmt]), sizes)
+        for fmt in SOURCE_ORDER if entry['variants'].get(fmt)
+    ))
+    return format_html('<picture>{}{}</picture>', sources, img)
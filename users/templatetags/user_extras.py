@@ -1,7 +1,38 @@
 from django import template
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
 
 register = template.Library()
 
 @register.filter
 def has_employee(user):
     return hasattr(user, 'employee')
+
+@register.simple_tag
+def user_role(user):
+    """
+    The user's employee role, or '' for anonymous users / users without an
+    Employee. Resolve it once per template with {% user_role user as role %}.
+    """
+    if not user.is_authenticated:
+        return ''
+    try:
+        return user.employee.role
+    except ObjectDoesNotExist:
+        return ''
+
+@register.simple_tag
+def navbar_cache(user):
+    """
+    Fragment-cache settings for the navbar links: they only depend on the
+    role, so every user with the same role shares one cached copy.
+    """
+    if not user.is_authenticated:
+        audience = 'anonymous'
+    else:
+        audience = user_role(user) or 'user'
+    return {
+        'timeout': getattr(settings, 'NAVBAR_CACHE_TIMEOUT', 600),
+        'key': f"{getattr(settings, 'PAGE_CACHE_VERSION', '1')}:{audience}",
+        'role': user_role(user),
+    }
@@ -1,3 +1,375 @@
-from django.test import TestCase
+import base64
+import datetime
+import json
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.cache import cache, caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ez_request.db.pool import close_pools
+from ez_request.db.routers import ReplicaRouter, primary_pinned, use_primary
+from ez_request.middleware import QueryInstrumentationMiddleware, ReplicaStickinessMiddleware
+from users.models import User
+from users.pagination import CursorPaginator
+from users.simulation import COOKIE_NAME, MAX_FIELD_LENGTHS, SimulationState
+
+
+class CheckRequestSimulationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('users:check_request')
+
+    def test_anonymous_get_writes_nothing(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(COOKIE_NAME, response.cookies)
+        self.assertNotIn('sessionid', response.cookies)
+        self.assertFalse(Session.objects.exists())
+
+    def test_flow_is_kept_in_cache_not_session(self):
+        response = self.client.post(self.url, {'start_sim': '1', 'sim_name': 'x' * 500, 'sim_role': 'Staff'})
+        self.assertIn(COOKIE_NAME, response.cookies)
+        self.assertEqual(response.context['sim_stage'], 'create_request')
+        self.assertEqual(len(response.context['sim_identity']['name']), MAX_FIELD_LENGTHS['name'])
+
+        response = self.client.post(self.url, {
+            'submit_sim_request': '1', 'category': 'LEAVE', 'title': 'Cuti', 'description': 'Libur',
+        })
+        self.assertEqual(response.context['sim_stage'], 'submitted_wait')
+        self.assertEqual(len(response.context['sim_elements']), 1)
+
+        # A plain GET afterwards reads the state without rewriting it
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context['sim_elements']), 1)
+        self.assertNotIn(COOKIE_NAME, response.cookies)
+        self.assertFalse(Session.objects.exists())
+
+    @override_settings(SIMULATION_QUEUE_MAX=3)
+    def test_queue_is_capped_oldest_first(self):
+        for i in range(5):
+            response = self.client.post(self.url, {'submit_sim_request': '1', 'category': 'LEAVE', 'title': f'R{i}'})
+        titles = [req['title'] for req in response.context['sim_elements']]
+        self.assertEqual(titles, ['R2', 'R3', 'R4'])
+
+        sim_id = SimulationState.load(response.wsgi_request).sim_id
+        self.assertEqual(len(cache.get(SimulationState.cache_key(sim_id))['order']), 3)
+
+    def test_approval_rewrites_only_that_entry(self):
+        response = self.client.post(self.url, {'submit_sim_request': '1', 'category': 'LEAVE', 'title': 'A'})
+        self.client.post(self.url, {'submit_sim_request': '1', 'category': 'LEAVE', 'title': 'B'})
+        req_id = response.context['sim_elements'][0]['id']
+
+        state = SimulationState.load(self.client.get(self.url).wsgi_request)
+        state.update_request(req_id, status='DISETUJUI', manager_status='APPROVED')
+        self.assertFalse(state._meta_dirty)
+        self.assertEqual(list(state._dirty_entries), [req_id])
+
+        response = self.client.post(self.url, {'approve_sim_request': '1', 'req_id': req_id, 'action': 'approve'})
+        statuses = {req['title']: req['status'] for req in response.context['sim_elements']}
+        self.assertEqual(statuses, {'A': 'DISETUJUI', 'B': 'MENUNGGU_PERSETUJUAN'})
+
+    @override_settings(SIMULATION_STATE_TTL=100)
+    def test_entries_outlive_the_index(self):
+        def post_at(offset, title):
+            with mock.patch('time.time', return_value=start + offset), \
+                    mock.patch.object(cache, 'set_many', wraps=cache.set_many) as set_many:
+                self.client.post(self.url, {'submit_sim_request': '1', 'category': 'LEAVE', 'title': title})
+            return [len(call.args[0]) for call in set_many.call_args_list]
+
+        start = time.time()
+        post_at(0, 'A')
+        # A was written to outlive this index, so only B is written
+        self.assertEqual(post_at(80, 'B'), [1])
+        # The index written now would outlive A: A is refreshed along with C
+        self.assertEqual(post_at(150, 'C'), [2])
+        with mock.patch('time.time', return_value=start + 240):
+            response = self.client.get(self.url)
+        self.assertEqual([req['title'] for req in response.context['sim_elements']], ['A', 'B', 'C'])
+
+    def test_purge_strips_legacy_session_keys(self):
+        legacy = SessionStore()
+        legacy.update({'sim_queue': [], 'sim_stage': 'identity'})
+        legacy.create()
+        mixed = SessionStore()
+        mixed.update({'sim_stage': 'identity', 'other': 1})
+        mixed.create()
+
+        call_command('purge_simulation_sessions', stdout=StringIO())
+
+        self.assertFalse(Session.objects.filter(pk=legacy.session_key).exists())
+        self.assertEqual(SessionStore(mixed.session_key).load(), {'other': 1})
+
+
+class CursorPaginatorTests(TestCase):
+    def setUp(self):
+        from employees.models import Employee
+        from service_requests.models import ServiceRequest
+        user = User.objects.create(username='staff')
+        employee = Employee.objects.create(user=user, role='KARYAWAN', position='-', department='-', date_hired='2024-01-01')
+        ServiceRequest.objects.bulk_create(
+            ServiceRequest(employee=employee, request_type='LEAVE', title=f'R{i}', description='-')
+            for i in range(25)
+        )
+        self.queryset = ServiceRequest.objects.all()
+        # Most rows share one timestamp, so only the id can order them
+        now = timezone.now()
+        ids = list(self.queryset.order_by('id').values_list('id', flat=True))
+        self.queryset.filter(id__in=ids[:20]).update(created_at=now)
+        self.queryset.filter(id__in=ids[20:]).update(created_at=now - datetime.timedelta(days=1))
+        self.expected = ids[19::-1] + ids[:19:-1]
+        self.paginator = CursorPaginator(self.queryset, 10)
+
+    def ids(self, page):
+        return [obj.id for obj in page]
+
+    def test_walks_forward_and_back_across_ties(self):
+        first = self.paginator.get_page()
+        second = self.paginator.get_page(first.next_cursor)
+        third = self.paginator.get_page(second.next_cursor)
+        self.assertEqual(self.ids(first) + self.ids(second) + self.ids(third), self.expected)
+        self.assertFalse(first.has_previous())
+        self.assertTrue(second.has_previous() and second.has_next())
+        self.assertFalse(third.has_next())
+
+        back = self.paginator.get_page(third.previous_cursor)
+        self.assertEqual(self.ids(back), self.ids(second))
+        self.assertTrue(back.has_previous())
+        start = self.paginator.get_page(back.previous_cursor)
+        self.assertEqual(self.ids(start), self.ids(first))
+        self.assertFalse(start.has_previous())
+        self.assertEqual(self.paginator.get_page(start.next_cursor).object_list, second.object_list)
+
+    def test_bad_token_falls_back_to_first_page(self):
+        def token(payload):
+            return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        for bad in ['garbage', '!!', token({'d': 'x', 'v': ['2024-01-01', 1]}), token({'d': 'n', 'v': [1]}),
+                    token({'d': 'n', 'v': ['not a date', 'x']})]:
+            page = self.paginator.get_page(bad)
+            self.assertEqual(self.ids(page), self.expected[:10], bad)
+            self.assertFalse(page.has_previous())
+
+    def test_empty_page(self):
+        paginator = CursorPaginator(self.queryset.none(), 10)
+        page = paginator.get_page()
+        self.assertEqual(len(page), 0)
+        self.assertFalse(page.has_other_pages())
+        # A cursor past the last row gives an empty page, not an error
+        last = self.paginator.get_page(self.paginator.get_page(self.paginator.get_page().next_cursor).next_cursor)
+        page = self.paginator.get_page(self.paginator.encode_cursor(last.object_list[-1], 'n'))
+        self.assertEqual(len(page), 0)
+        self.assertFalse(page.has_next() or page.has_previous())
+
+
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        caches['pages'].clear()
+        self.url = reverse('users:about')
+
+    def test_repeat_visits_are_served_from_cache(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+
+        with self.assertNumQueries(0), self.assertTemplateNotUsed('users/about.html'):
+            second = self.client.get(self.url)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['X-Page-Cache'], 'hit')
+
+        not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        not_modified = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_authenticated_users_skip_the_cache(self):
+        self.client.get(self.url)
+        user = User.objects.create(username='reader')
+        self.client.force_login(user)
+
+        with self.assertTemplateUsed('users/about.html'):
+            response = self.client.get(self.url)
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertContains(response, 'reader')
+
+
+class NavbarFragmentCacheTests(TestCase):
+    def test_links_are_cached_per_role(self):
+        from employees.models import Employee
+        cache.clear()
+        for username, role, visible, hidden in [
+            ('staff', 'KARYAWAN', 'me-1"></i> My Requests', 'me-1"></i> Employees'),
+            ('admin', 'ADMIN', 'me-1"></i> Employees', 'me-1"></i> My Requests'),
+        ]:
+            user = User.objects.create(username=username)
+            Employee.objects.create(user=user, role=role, position='-', department='-', date_hired='2024-01-01')
+            self.client.force_login(user)
+            for _ in range(2):
+                response = self.client.get(reverse('users:dashboard'))
+                self.assertContains(response, visible)
+                self.assertNotContains(response, hidden)
+                self.assertContains(response, username)
+
+
+class StaticPipelineTests(TestCase):
+    def test_responsive_image_falls_back_to_plain_img_without_build(self):
+        from django.template import Context, Template
+        html = Template(
+            "{% load responsive_images %}{% responsive_image 'images/arul_person.jpeg' alt='Dev' class='card-img-top' %}"
+        ).render(Context())
+        self.assertTrue(html.startswith('<img'))
+        self.assertIn('loading="lazy"', html)
+        self.assertIn('/static/images/arul_person.jpeg', html)
+
+    def test_variants_are_never_upscaled(self):
+        import io
+        from ez_request import staticfiles
+        if not staticfiles.supported_formats():
+            self.skipTest('Pillow without WebP/AVIF support')
+        buffer = io.BytesIO()
+        staticfiles.Image.new('RGB', (500, 250), 'white').save(buffer, 'JPEG')
+        buffer.seek(0)
+
+        rendered = staticfiles.render_variants(buffer, ['webp'], [320, 640])
+        self.assertEqual(next(rendered)[:2], (500, 250))
+        self.assertEqual([width for width, _, _ in rendered], [320, 500])
+        self.assertIn('.gz', staticfiles.compress(b'body { color: red; }\n' * 50))
+
+
+@override_settings(SQL_INSTRUMENTATION=True, SQL_QUERY_BUDGET=2, SQL_TIME_BUDGET_MS=10_000)
+class QueryInstrumentationTests(TestCase):
+    def view(self, queries):
+        def get_response(request):
+            for _ in range(queries):
+                User.objects.count()
+            return HttpResponse('ok')
+        return get_response
+
+    def test_server_timing_within_budget(self):
+        middleware = QueryInstrumentationMiddleware(self.view(2))
+        with self.assertNoLogs('ez_request.sql'):
+            response = middleware(RequestFactory().get('/'))
+        self.assertTrue(response['Server-Timing'].startswith('db;dur='))
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+        self.assertIn('1 duplicate, 1 similar', response['Server-Timing'])
+
+    def test_over_budget_is_logged(self):
+        middleware = QueryInstrumentationMiddleware(self.view(3))
+        with self.assertLogs('ez_request.sql', 'WARNING') as logs:
+            middleware(RequestFactory().get('/slow/'))
+        event = json.loads(logs.records[0].getMessage())
+        self.assertEqual((event['event'], event['path'], event['queries']), ('sql_budget_exceeded', '/slow/', 3))
+        self.assertEqual(event['similar_queries'], 2)
+
+    def test_streaming_body_is_counted_when_exhausted(self):
+        def rows():
+            for _ in range(3):
+                yield f'{User.objects.count()}\n'
+
+        middleware = QueryInstrumentationMiddleware(lambda request: StreamingHttpResponse(rows()))
+        with self.assertNoLogs('ez_request.sql'):
+            response = middleware(RequestFactory().get('/export/'))
+        self.assertNotIn('Server-Timing', response)
+        with self.assertLogs('ez_request.sql', 'WARNING') as logs:
+            self.assertEqual(b''.join(response.streaming_content), b'0\n0\n0\n')
+        self.assertEqual(json.loads(logs.records[0].getMessage())['queries'], 3)
+
+    def test_disabled_by_default(self):
+        with override_settings(SQL_INSTRUMENTATION=False), self.assertRaises(MiddlewareNotUsed):
+            QueryInstrumentationMiddleware(self.view(0))
+
+
+class CheckDatabaseCommandTests(TestCase):
+    def test_reports_reachable_database(self):
+        out = StringIO()
+        call_command('check_database', database=['default'], stdout=out)
+        self.assertIn('default: sqlite', out.getvalue())
+        self.assertIn('All databases reachable', out.getvalue())
+
+    def test_unknown_alias_fails(self):
+        with self.assertRaises(CommandError):
+            call_command('check_database', database=['nope'], stdout=StringIO())
+
+
+class ConnectionPoolTests(TestCase):
+    def wrapper(self, path, max_size=1):
+        from ez_request.db.backends.sqlite3.base import DatabaseWrapper
+        settings_dict = {**connection.settings_dict, 'NAME': path, 'OPTIONS': {'pool': {'max_size': max_size}}}
+        return DatabaseWrapper(settings_dict, alias='pool_test')
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(close_pools)
+        self.path = os.path.join(self.tmp.name, 'pool.sqlite3')
+
+    def test_released_connection_is_reused(self):
+        first = self.wrapper(self.path)
+        first.ensure_connection()
+        raw = first.connection
+        first.close()
+
+        # Another wrapper (i.e. another thread) picks up the same connection
+        second = self.wrapper(self.path)
+        with second.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertIs(second.connection, raw)
+        second.close()
+        self.assertEqual(second.pool.stats()['hits'], 1)
+
+    def test_overflow_and_broken_connections_are_closed(self):
+        a, b = self.wrapper(self.path), self.wrapper(self.path)
+        a.ensure_connection()
+        b.ensure_connection()
+        a.close()
+        b.close()
+        self.assertEqual(a.pool.stats()['idle'], 1)
+
+        a.ensure_connection()
+        a.errors_occurred = True
+        a.close()
+        self.assertEqual(a.pool.stats()['idle'], 0)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(SimpleTestCase):
+    def test_reads_go_to_replica_unless_pinned(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(User), 'replica')
+        self.assertEqual(router.db_for_read(Session), 'default')
+        self.assertEqual(router.db_for_write(User), 'default')
+        with use_primary():
+            self.assertEqual(router.db_for_read(User), 'default')
+        self.assertTrue(router.allow_migrate('default', 'users'))
+        self.assertFalse(router.allow_migrate('replica', 'users'))
+
+    def test_writes_pin_reads_to_primary(self):
+        seen = []
+
+        def view(request):
+            seen.append(primary_pinned())
+            return HttpResponse()
+
+        middleware = ReplicaStickinessMiddleware(view)
+        factory = RequestFactory()
+
+        middleware(factory.get('/'))
+        response = middleware(factory.post('/'))
+        self.assertEqual(response.cookies['ez_primary']['max-age'], 5)
+        # The redirect that follows still reads from the primary
+        middleware(factory.get('/', HTTP_COOKIE='ez_primary=1'))
+        self.assertEqual(seen, [False, True, True])
+        self.assertFalse(primary_pinned())
@@ -4,12 +4,16 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from users.forms import UserRegistrationForm, LoginForm, UserUpdateForm
 from users.models import User
+from users.simulation import SimulationState
+from ez_request.page_cache import cache_anonymous_page
 import uuid
 import datetime
 
+@cache_anonymous_page
 def welcome_view(request):
     return render(request, 'users/welcome.html')
 
+@cache_anonymous_page
 def about_view(request):
     return render(request, 'users/about.html')
 
@@ -19,9 +23,11 @@ def contact_view(request):
         return redirect('users:contact')
     return render(request, 'users/contact.html')
 
+@cache_anonymous_page
 def gallery_view(request):
     return render(request, 'users/gallery.html')
 
+@cache_anonymous_page
 def team_view(request):
     return render(request, 'users/team.html')
 
@@ -67,7 +73,8 @@ def calculate_salary_logic(name, role, religion):
 def check_request_view(request):
     """
     View for checking request status (dummy), calculating salary, and simulated approval flow.
-    Accessible without login. Uses Session to store list of requests.
+    Accessible without login. State lives in SimulationState (cache + signed cookie),
+    not the DB session, and is only written when it actually changes.
     """
     
     # --- DUMMY DATA FOR REQUEST TYPES (DISPLAY PURPOSES) ---
@@ -77,30 +84,20 @@ def check_request_view(request):
         {"title": "Permintaan Cuti", "category": "LEAVE", "estimated_time": "1-2 Hari"},
     ]
 
-    # Initialize Session if not exists
-    if 'sim_queue' not in request.session:
-        request.session['sim_queue'] = []
-    
-    # Helper to get queue
-    sim_queue = request.session['sim_queue']
+    state = SimulationState.load(request)
 
     context = {
         'available_services': available_services,
         'result': None, # For Salary Calculation Result
-        'sim_elements': sim_queue,
-        'sim_stage': request.session.get('sim_stage', 'identity'), 
-        'sim_identity': request.session.get('sim_identity', {}),
-        'allowed_categories': request.session.get('allowed_categories', [])
     }
 
     if request.method == "POST":
         # === 0. RESET SIMULATION (Top Priority) ===
         if 'reset_sim' in request.POST:
-            request.session['sim_queue'] = []
-            request.session['sim_stage'] = 'identity'
-            request.session['sim_identity'] = {}
-            request.session['allowed_categories'] = []
-            return redirect('users:check_request')
+            state.reset()
+            response = redirect('users:check_request')
+            state.save(response)
+            return response
 
         # === 1. SALARY CALCULATION LOGIC ===
         elif 'calculate_salary' in request.POST:
@@ -112,17 +109,15 @@ def check_request_view(request):
 
         # === 2. SIMULATION: IDENTITY STEP ===
         elif 'start_sim' in request.POST:
-            name = request.POST.get('sim_name')
-            role = request.POST.get('sim_role')
+            name = request.POST.get('sim_name') or ''
+            role = request.POST.get('sim_role') or ''
             
-            identity = {'name': name, 'role': role}
-            request.session['sim_identity'] = identity
-            context['sim_identity'] = identity
+            state.identity = {'name': name, 'role': role}
             
             if role == 'Director':
-                request.session['sim_stage'] = 'director_approval'
+                state.stage = 'director_approval'
                 # Generate dummy requests only if empty to show something
-                if not sim_queue:
+                if not len(state):
                     dummy_req = {
                         'id': str(uuid.uuid4()),
                         'title': 'Anggaran Pemasaran Q4',
@@ -136,28 +131,27 @@ def check_request_view(request):
                         'amount': '150000000',
                         'manager_status': 'APPROVED'
                     }
-                    sim_queue.append(dummy_req)
-                    request.session['sim_queue'] = sim_queue
+                    state.add_request(dummy_req)
                 
             elif role == 'Manager':
-                 request.session['sim_stage'] = 'manager_menu'
+                 state.stage = 'manager_menu'
                  
             else: # Staff
-                request.session['sim_stage'] = 'create_request'
-                request.session['allowed_categories'] = ['REIMBURSEMENT', 'LEAVE']
+                state.stage = 'create_request'
+                state.allowed_categories = ['REIMBURSEMENT', 'LEAVE']
 
         # === 3. MANAGER MENU ACTION ===
         elif 'manager_action' in request.POST:
-             # Identity already in session
+             # Identity already in state
              action = request.POST.get('manager_choice')
              
              if action == 'create':
-                 request.session['sim_stage'] = 'create_request'
-                 request.session['allowed_categories'] = ['PROPOSAL', 'REIMBURSEMENT', 'LEAVE']
+                 state.stage = 'create_request'
+                 state.allowed_categories = ['PROPOSAL', 'REIMBURSEMENT', 'LEAVE']
              elif action == 'approve':
-                 request.session['sim_stage'] = 'manager_approval_list'
+                 state.stage = 'manager_approval_list'
                  # Simulate a request from a Staff if empty
-                 if not sim_queue:
+                 if not len(state):
                      dummy_req = {
                         'id': str(uuid.uuid4()),
                         'title': 'Charger Laptop Baru',
@@ -171,8 +165,7 @@ def check_request_view(request):
                         'amount': '450000',
                         'manager_status': 'PENDING'
                     }
-                     sim_queue.append(dummy_req)
-                     request.session['sim_queue'] = sim_queue
+                     state.add_request(dummy_req)
 
         # === 4. SIMULATION: SUBMIT REQUEST (Staff/Manager) ===
         elif 'submit_sim_request' in request.POST:
@@ -188,7 +181,7 @@ def check_request_view(request):
             elif req_type == 'LEAVE': estimation = "2 Hari"
             else: estimation = "3 Hari"
             
-            current_identity = request.session.get('sim_identity', {})
+            current_identity = state.identity
             
             new_req = {
                 'id': str(uuid.uuid4()),
@@ -209,10 +202,8 @@ def check_request_view(request):
             if current_identity.get('role') == 'Manager':
                 new_req['manager_status'] = 'APPROVED' 
             
-            sim_queue.append(new_req)
-            request.session['sim_queue'] = sim_queue
-            
-            request.session['sim_stage'] = 'submitted_wait'
+            state.add_request(new_req)
+            state.stage = 'submitted_wait'
 
         # === 5. SIMULATION: APPROVAL (Manager/Director) ===
         elif 'approve_sim_request' in request.POST:
@@ -222,38 +213,30 @@ def check_request_view(request):
              
              final_status = 'DISETUJUI' if action == 'approve' else 'DITOLAK'
              
-             # Find and update
-             for req in sim_queue:
-                 if req['id'] == req_id:
-                     req['status'] = final_status
-                     req['manager_comment'] = manager_comment
-                     req['approved_at'] = 'Baru Saja'
-                     
-                     if action == 'approve':
-                         req['manager_status'] = 'APPROVED'
-                     else:
-                         req['manager_status'] = 'REJECTED'
-                     
-                     break
-             
-             request.session['sim_queue'] = sim_queue
-             # Stay on list
-             # request.session['sim_stage'] = 'completed'
+             # Find and update; stay on list
+             state.update_request(
+                 req_id,
+                 status=final_status,
+                 manager_comment=manager_comment,
+                 approved_at='Baru Saja',
+                 manager_status='APPROVED' if action == 'approve' else 'REJECTED',
+             )
 
         # === 6. SWITCH USER (Keep Data) ===
         elif 'switch_user' in request.POST:
-            request.session['sim_stage'] = 'identity'
-            request.session['sim_identity'] = {}
-            request.session['allowed_categories'] = []
-            return redirect('users:check_request')
+            state.reset(keep_queue=True)
+            response = redirect('users:check_request')
+            state.save(response)
+            return response
 
-    # Update context from session state
-    context['sim_stage'] = request.session.get('sim_stage', 'identity')
-    context['sim_identity'] = request.session.get('sim_identity', {})
-    context['allowed_categories'] = request.session.get('allowed_categories', [])
-    context['sim_elements'] = request.session.get('sim_queue', [])
+    context['sim_stage'] = state.stage
+    context['sim_identity'] = state.identity
+    context['allowed_categories'] = state.allowed_categories
+    context['sim_elements'] = state.queue
 
-    return render(request, 'users/check_request.html', context)
+    response = render(request, 'users/check_request.html', context)
+    state.save(response)
+    return response
 
 def register_view(request):
     if request.method == 'POST':
@@ -271,10 +254,10 @@ def register_view(request):
 def dashboard_view(request):
     from employees.models import Employee
     from service_requests.models import ServiceRequest
-    from django.db.models import Q
+    from service_requests.counters import get_dashboard_counts
     
-    employee_count = Employee.objects.count()
-    recent_employees = Employee.objects.select_related('user').order_by('-date_hired')[:5]
+    employee_count = 0
+    recent_employees = []
     
     pending_approvals_count = 0
     total_history_count = 0
@@ -285,51 +268,31 @@ def dashboard_view(request):
     if hasattr(request.user, 'employee'):
         employee = request.user.employee
         
+        # Admin widgets
+        if employee.role == 'ADMIN':
+            employee_count = Employee.objects.count()
+            recent_employees = Employee.objects.select_related('user').order_by('-date_hired')[:5]
+        
+        # All per-role counters come from one aggregation (cached per employee)
+        counts = get_dashboard_counts(employee)
+        pending_approvals_count = counts['pending_approvals_count']
+        total_history_count = counts['total_history_count']
+        total_requests_count = counts['total_requests_count']
+        
         # 1. Logic for RECENT REQUESTS (Karyawan & Manager)
         if employee.role in ['KARYAWAN', 'MANAGER']:
             recent_requests = ServiceRequest.objects.filter(employee=employee).order_by('-created_at')[:5]
-            total_requests_count = ServiceRequest.objects.filter(employee=employee).count()
             
-        # 2. Logic for RECENT APPROVALS & Counts (Manager & Direktur)
+        # 2. Logic for RECENT APPROVALS (Manager & Direktur)
         if employee.role == 'MANAGER':
-            # Summary Count
-            pending_approvals_count = ServiceRequest.objects.filter(
-                manager_approver=employee, 
-                manager_status='PENDING'
-            ).count()
-            
-            total_history_count = ServiceRequest.objects.filter(
-                manager_approver=employee
-            ).exclude(manager_status='PENDING').count()
-            
-            # Recent Approvals list
             recent_approvals = ServiceRequest.objects.filter(
                 manager_approver=employee
-            ).order_by('-updated_at')[:5]
+            ).select_related('employee__user').order_by('-updated_at')[:5]
 
         elif employee.role == 'DIREKTUR':
-            # Summary Count
-            pending_approvals_count = ServiceRequest.objects.filter(
-                director_approver=employee, 
-                director_status='PENDING'
-            ).filter(
-                Q(manager_status='APPROVED') | Q(manager_status='NA') | Q(manager_approver__isnull=True)
-            ).count()
-            
-            total_history_count = ServiceRequest.objects.filter(
-                director_approver=employee
-            ).exclude(director_status='PENDING').count()
-            
-            # Recent Approvals list
             recent_approvals = ServiceRequest.objects.filter(
                 director_approver=employee
-            ).order_by('-updated_at')[:5]
-            
-        # Clean up for Admin/General
-        if employee.role == 'ADMIN':
-            recent_requests = []
-        else:
-            recent_employees = []
+            ).select_related('employee__user').order_by('-updated_at')[:5]
 
 
     return render(request, 'users/dashboard.html', {